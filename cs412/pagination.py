@@ -0,0 +1,149 @@
+# file: pagination.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Keyset (cursor) pagination shared by the voter list and mini_insta's lists.
+
+import base64
+import json
+from datetime import date
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(direction, values):
+    '''Return an opaque token for the position just after/before values.'''
+    values = [value.isoformat() if isinstance(value, date) else value for value in values]
+    data = json.dumps([direction, values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    '''Return (direction, values) from a token, or None if it is not valid.'''
+    try:
+        data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        direction, values = json.loads(data)
+    except (ValueError, TypeError):
+        return None
+    if direction not in ('next', 'prev') or not isinstance(values, list):
+        return None
+    return direction, values
+
+
+class KeysetPage:
+    '''One page of results from a KeysetPaginator.'''
+
+    def __init__(self, paginator, object_list, next_cursor, previous_cursor):
+        self.paginator = paginator
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    '''Paginate a queryset by seeking past the last row of the previous page.
+
+    Instead of OFFSET, each page is fetched with a WHERE clause on the
+    ordering columns, so with an index on them every page costs the same no
+    matter how deep it is. ordering lists the columns ('-' for descending)
+    and must end with a unique column, e.g. ('-timestamp', '-pk'). The total
+    count is cached under count_key because it is only shown as an
+    approximate number.
+    '''
+
+    count_timeout = 10 * 60
+
+    def __init__(self, queryset, per_page, ordering=('pk',), count_key=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+        self.descending = [field.startswith('-') for field in self.ordering]
+        self.count_key = count_key
+
+    @property
+    def count(self):
+        '''The (possibly cached) number of rows in the queryset.'''
+        if self.count_key is None:
+            return self.queryset.count()
+        return cache.get_or_set(self.count_key, self.queryset.count, self.count_timeout)
+
+    def get_key(self, obj):
+        '''Return the values of the ordering columns for obj.'''
+        return [getattr(obj, field) for field in self.fields]
+
+    def seek(self, values, forward=True):
+        '''Return a Q matching the rows after (forward) or before values in the ordering.'''
+        ops = ['gt' if forward != descending else 'lt' for descending in self.descending]
+        q = Q()
+        for i, field in enumerate(self.fields):
+            equal = dict(zip(self.fields[:i], values[:i]))
+            q |= Q(**equal, **{f'{field}__{ops[i]}': values[i]})
+        # a redundant range on the first column lets the database seek in the index
+        first = {f'{self.fields[0]}__{ops[0]}e': values[0]}
+        return Q(**first) & q
+
+    def rows(self, values=None, forward=True):
+        '''Return up to per_page + 1 rows after/before values (from the start if None).
+
+        Returns None if values do not fit the ordering columns (a tampered cursor).
+        '''
+        queryset = self.queryset
+        ordering = self.ordering
+        if not forward:
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+        try:
+            if values is not None:
+                queryset = queryset.filter(self.seek(values, forward))
+            return list(queryset.order_by(*ordering)[:self.per_page + 1])
+        except (TypeError, ValueError, ValidationError):
+            return None
+
+    def page(self, cursor=None):
+        '''Return the KeysetPage for cursor (the first page if cursor is None or invalid).'''
+        position = decode_cursor(cursor) if cursor else None
+        if position and len(position[1]) != len(self.ordering):
+            position = None
+
+        rows = None
+        if position is not None:
+            direction, values = position
+            rows = self.rows(values, forward=direction == 'next')
+
+        if rows is None:
+            rows = self.rows()
+            more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_next, has_previous = more, False
+
+        elif direction == 'next':
+            more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_next, has_previous = more, True
+
+        else:
+            # walked backwards from the cursor; put the rows back in order
+            more = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_next, has_previous = True, more
+
+        next_cursor = encode_cursor('next', self.get_key(rows[-1])) if rows and has_next else None
+        previous_cursor = encode_cursor('prev', self.get_key(rows[0])) if rows and has_previous else None
+        return KeysetPage(self, rows, next_cursor, previous_cursor)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DadjokesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dadjokes'
+
+    def ready(self):
+        # connect the signal handlers that keep the random-selection id cache fresh
+        from . import signals  # noqa: F401
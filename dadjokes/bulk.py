@@ -0,0 +1,86 @@
+import json
+
+from django.db import transaction
+from rest_framework import serializers
+
+from .selection import invalidate_ids
+
+
+# Rows per INSERT statement when bulk creating
+BULK_BATCH_SIZE = 500
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    '''
+    A list serializer that validates each item on its own, so one bad item
+    does not reject the rest, and writes the valid ones with bulk_create.
+
+    After is_valid(), item_errors maps the position of each rejected item
+    to its errors.
+    '''
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError({'non_field_errors': ['Expected a list of items.']})
+        self.item_errors = {}
+        valid = []
+        for position, item in enumerate(data):
+            try:
+                valid.append(self.child.run_validation(item))
+            except serializers.ValidationError as exc:
+                self.item_errors[position] = exc.detail
+        return valid
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        created = model.objects.bulk_create([model(**attrs) for attrs in validated_data],
+                                            batch_size=BULK_BATCH_SIZE)
+        # bulk_create sends no post_save signals, so drop the cached ids here
+        transaction.on_commit(lambda: invalidate_ids(model))
+        return created
+
+
+def parse_items(lines, start=0):
+    '''
+    Parse NDJSON lines (one JSON object per line; blank lines are skipped).
+
+    Returns (items, errors): items is a list of (index, object) pairs and
+    errors maps the index of each line that is not valid JSON to a message.
+    Indexes count the non-blank lines, starting at start.
+    '''
+    items, errors = [], {}
+    index = start
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            items.append((index, json.loads(line)))
+        except ValueError as exc:
+            errors[index] = [f'Invalid JSON: {exc}']
+        index += 1
+    return items, errors
+
+
+def parse_body(body):
+    '''
+    Parse a request body holding a JSON array or NDJSON, as parse_items does.
+    Raises ValueError if the body is not text or is a malformed JSON array.
+    '''
+    text = body.decode('utf-8') if isinstance(body, bytes) else body
+    if text.lstrip().startswith('['):
+        items = json.loads(text)
+        if not isinstance(items, list):
+            raise ValueError('Expected a JSON array.')
+        return list(enumerate(items)), {}
+    return parse_items(text.splitlines())
+
+
+def import_items(serializer_class, items, context=None):
+    '''
+    Validate (index, object) pairs with serializer_class and bulk create the
+    valid ones. Returns (number created, {index: errors} for the rejected ones).
+    '''
+    serializer = serializer_class(data=[item for _, item in items], many=True, context=context or {})
+    serializer.is_valid()
+    created = serializer.save()
+    errors = {items[position][0]: detail for position, detail in serializer.item_errors.items()}
+    return len(created), errors
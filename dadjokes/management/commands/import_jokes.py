@@ -0,0 +1,62 @@
+import json
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dadjokes.bulk import import_items, parse_body, parse_items
+from dadjokes.serializers import JokeSerializer, PictureSerializer
+
+
+class Command(BaseCommand):
+    '''
+    Bulk load jokes (or pictures) from a local JSON array or NDJSON file.
+    '''
+    help = 'Import jokes or pictures from a JSON array or NDJSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File holding a JSON array or one JSON object per line.')
+        parser.add_argument('--pictures', action='store_true', help='Import pictures instead of jokes.')
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help='Items validated and written together (default 5000).')
+
+    def handle(self, *args, **options):
+        '''
+        Import the file chunk by chunk and report the rejected items.
+        '''
+        serializer_class = PictureSerializer if options['pictures'] else JokeSerializer
+        chunk_size = options['chunk_size']
+        created, errors = 0, {}
+
+        try:
+            with open(options['path'], encoding='utf-8') as f:
+                first = f.read(1)
+                while first.isspace():
+                    first = f.read(1)
+                f.seek(0)
+                if first == '[':
+                    # a JSON array has to be read whole
+                    items, errors = parse_body(f.read())
+                    chunks = (items[i:i + chunk_size] for i in range(0, len(items), chunk_size))
+                    for chunk in chunks:
+                        n, chunk_errors = import_items(serializer_class, chunk)
+                        created += n
+                        errors.update(chunk_errors)
+                else:
+                    # NDJSON is read a chunk of lines at a time
+                    start = 0
+                    while lines := list(islice(f, chunk_size)):
+                        items, chunk_errors = parse_items(lines, start)
+                        start += len(items) + len(chunk_errors)
+                        n, item_errors = import_items(serializer_class, items)
+                        created += n
+                        errors.update(chunk_errors)
+                        errors.update(item_errors)
+        except OSError as exc:
+            raise CommandError(f'Could not read {options["path"]}: {exc}')
+        except ValueError as exc:
+            raise CommandError(f'Could not parse {options["path"]}: {exc}')
+
+        for index in sorted(errors):
+            self.stderr.write(f'item {index}: {json.dumps(errors[index])}')
+        name = 'pictures' if options['pictures'] else 'jokes'
+        self.stdout.write(self.style.SUCCESS(f'Imported {created} {name}; rejected {len(errors)}.'))
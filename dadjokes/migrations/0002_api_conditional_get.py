@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dadjokes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='joke',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='picture',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='joke',
+            index=models.Index(fields=['-created_at'], name='joke_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joke',
+            index=models.Index(fields=['updated_at'], name='joke_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='picture',
+            index=models.Index(fields=['-created_at'], name='picture_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='picture',
+            index=models.Index(fields=['updated_at'], name='picture_updated_idx'),
+        ),
+    ]
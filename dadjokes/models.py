@@ -6,6 +6,14 @@ class Joke(models.Model):
     text = models.TextField()
     contributor = models.CharField(max_length=200)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            # newest-first API pages, and the newest change for ETags
+            models.Index(fields=['-created_at'], name='joke_created_idx'),
+            models.Index(fields=['updated_at'], name='joke_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.text[:50]}... by {self.contributor}"
@@ -15,6 +23,14 @@ class Picture(models.Model):
     image_url = models.URLField(max_length=500)
     contributor = models.CharField(max_length=200)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            # newest-first API pages, and the newest change for ETags
+            models.Index(fields=['-created_at'], name='picture_created_idx'),
+            models.Index(fields=['updated_at'], name='picture_updated_idx'),
+        ]
     
     def __str__(self):
         return f"Picture by {self.contributor}"
\ No newline at end of file
@@ -0,0 +1,14 @@
+from rest_framework.pagination import CursorPagination
+
+
+class NewestFirstCursorPagination(CursorPagination):
+    '''
+    Cursor pagination for the API listings, newest first.
+
+    Pages are read with a WHERE on created_at (backed by an index) rather
+    than an OFFSET, so every page costs the same however deep it is.
+    '''
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
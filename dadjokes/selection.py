@@ -0,0 +1,81 @@
+from array import array
+import random
+import time
+import uuid
+
+from django.core.cache import cache
+
+
+# How long a process keeps its id list before reading it again from the database
+ID_CACHE_TIMEOUT = 5 * 60
+
+# How many times to retry when a cached id points at a deleted row
+MAX_ATTEMPTS = 3
+
+# model label -> (generation, loaded at, ids), kept in this process only so
+# the array is never pickled in or out of the cache
+_id_memo = {}
+
+
+def id_generation_key(model):
+    '''
+    Return the cache key for the generation of the id list of model.
+    '''
+    return f'dadjokes:ids:{model._meta.label_lower}'
+
+
+def id_generation(model):
+    '''
+    Return the current generation token for the ids of model, starting one if there is none.
+    '''
+    key = id_generation_key(model)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_ids(model):
+    '''
+    Return the ids of all rows of model as a compact array.
+
+    The array is kept in this process and reused while the shared generation
+    token is unchanged and it is younger than ID_CACHE_TIMEOUT, so a call
+    only reads one small cache entry.
+    '''
+    label = model._meta.label_lower
+    generation = id_generation(model)
+    memo = _id_memo.get(label)
+    if memo is not None and memo[0] == generation and time.monotonic() - memo[1] < ID_CACHE_TIMEOUT:
+        return memo[2]
+    ids = array('q', model.objects.values_list('pk', flat=True))
+    _id_memo[label] = (generation, time.monotonic(), ids)
+    return ids
+
+
+def invalidate_ids(model):
+    '''
+    Forget the ids of model (after rows are created or deleted). A new
+    generation is stored in the cache, so every process sharing it reloads.
+    '''
+    _id_memo.pop(model._meta.label_lower, None)
+    cache.set(id_generation_key(model), uuid.uuid4().hex, None)
+
+
+def random_instance(model):
+    '''
+    Return one random row of model (or None if there are none), reading only that row.
+
+    The id is picked from the cached id list; if that row has been deleted
+    since the list was cached, the list is refreshed and another id is tried.
+    '''
+    for _ in range(MAX_ATTEMPTS):
+        ids = get_ids(model)
+        if not ids:
+            return None
+        instance = model.objects.filter(pk=random.choice(ids)).first()
+        if instance is not None:
+            return instance
+        invalidate_ids(model)
+    return None
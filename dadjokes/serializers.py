@@ -1,26 +1,43 @@
 from rest_framework import serializers
+from .bulk import BulkListSerializer
 from .models import Joke, Picture
 
-class JokeSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    '''
+    Let API clients ask for some of a serializer's fields with ?fields=a,b.
+    Unknown names are ignored; with no known names, every field is returned.
+    '''
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD') or not request.GET.get('fields'):
+            return
+        requested = {name.strip() for name in request.GET['fields'].split(',')}
+        if requested & set(self.fields):
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+class JokeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     '''
     A serializer for the Joke model.
     '''
     class Meta:
         model = Joke
         fields = ['id', 'text', 'contributor', 'created_at']
+        list_serializer_class = BulkListSerializer
     
     def create(self, validated_data):
         '''
         Override the superclass method that handles object creation.
         '''
-        print(f'JokeSerializer.create, validated_data={validated_data}.')
         # Create and save the joke
         return Joke.objects.create(**validated_data)
 
-class PictureSerializer(serializers.ModelSerializer):
+class PictureSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     '''
     A serializer for the Picture model.
     '''
     class Meta:
         model = Picture
-        fields = ['id', 'image_url', 'contributor', 'created_at']
\ No newline at end of file
+        fields = ['id', 'image_url', 'contributor', 'created_at']
+        list_serializer_class = BulkListSerializer
\ No newline at end of file
@@ -0,0 +1,26 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Joke, Picture
+from .selection import invalidate_ids
+
+
+@receiver(post_save, sender=Joke)
+@receiver(post_save, sender=Picture)
+def row_saved(sender, instance, created, **kwargs):
+    '''
+    Drop the cached ids once a new Joke or Picture is committed (so a
+    concurrent request cannot refill the cache from before the commit).
+    '''
+    if created:
+        transaction.on_commit(lambda: invalidate_ids(sender))
+
+
+@receiver(post_delete, sender=Joke)
+@receiver(post_delete, sender=Picture)
+def row_deleted(sender, instance, **kwargs):
+    '''
+    Drop the cached ids once a Joke or Picture deletion is committed.
+    '''
+    transaction.on_commit(lambda: invalidate_ids(sender))
@@ -1,3 +1,148 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.urls import reverse
+
+from .models import Joke
+from .selection import get_ids, id_generation_key, random_instance
 
 # Create your tests here.
+
+class RandomSelectionTests(TestCase):
+    '''
+    Random jokes are read one row at a time from a cached id list.
+    '''
+
+    def setUp(self):
+        cache.clear()
+        self.jokes = [Joke.objects.create(text=f'joke {i}', contributor='dad') for i in range(20)]
+
+    def test_random_joke_reads_one_row(self):
+        get_ids(Joke)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('api_random_joke'))
+        self.assertIn(response.json()['id'], [joke.pk for joke in self.jokes])
+
+    def test_id_cache_follows_creates_and_deletes(self):
+        self.assertEqual(len(get_ids(Joke)), 20)
+        with self.captureOnCommitCallbacks(execute=True):
+            Joke.objects.create(text='new', contributor='dad')
+            # still cached until the write commits
+            self.assertEqual(len(get_ids(Joke)), 20)
+        self.assertEqual(len(get_ids(Joke)), 21)
+        with self.captureOnCommitCallbacks(execute=True):
+            Joke.objects.all().delete()
+        self.assertIsNone(random_instance(Joke))
+        self.assertEqual(self.client.get(reverse('api_random_joke')).json(), {})
+
+    def test_stale_ids_are_refreshed(self):
+        get_ids(Joke)
+        # delete without signals, as another process with its own cache would
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM dadjokes_joke WHERE id <> %s', [self.jokes[0].pk])
+        self.assertEqual(random_instance(Joke), self.jokes[0])
+
+    def test_new_generation_reloads_ids(self):
+        self.assertEqual(len(get_ids(Joke)), 20)
+        with self.assertNumQueries(0):
+            get_ids(Joke)
+        # another process sharing the cache invalidates the list
+        cache.set(id_generation_key(Joke), 'other', None)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(get_ids(Joke)), 20)
+
+
+class JokeListAPITests(TestCase):
+    '''
+    The joke listing is paginated, can return a subset of fields, and
+    answers repeated polls with 304 Not Modified.
+    '''
+
+    def setUp(self):
+        self.jokes = [Joke.objects.create(text=f'joke {i}', contributor='dad') for i in range(25)]
+        self.url = reverse('api_jokes')
+
+    def test_listing_is_paginated_newest_first(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(len(data['results']), 20)
+        self.assertEqual(data['results'][0]['id'], self.jokes[-1].pk)
+        rest = self.client.get(data['next']).json()
+        self.assertEqual(len(rest['results']), 5)
+        self.assertIsNone(rest['next'])
+
+    def test_fields_selects_a_subset(self):
+        data = self.client.get(self.url, {'fields': 'id,text,nope'}).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'text'})
+
+    def test_unchanged_listing_is_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertFalse(response.has_header('Last-Modified'))
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.jokes[0].text = 'edited'
+        self.jokes[0].save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_deleting_a_joke_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.jokes[3].delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag,
+                                   HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+
+class BulkImportTests(TestCase):
+    '''
+    Jokes can be created in bulk from a JSON array or NDJSON, over the API
+    or from a file; bad items are reported without rejecting the rest.
+    '''
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('api_jokes_bulk')
+
+    def test_json_array_reports_bad_items(self):
+        items = [{'text': f'joke {i}', 'contributor': 'dad'} for i in range(3)] + [{'text': 'no contributor'}]
+        self.assertEqual(len(get_ids(Joke)), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, json.dumps(items), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['created'], 3)
+        self.assertEqual([error['index'] for error in data['errors']], [3])
+        self.assertIn('contributor', data['errors'][0]['errors'])
+        # bulk_create sends no signals, so the id cache is dropped by hand
+        self.assertEqual(len(get_ids(Joke)), 3)
+
+    def test_ndjson_reports_bad_lines(self):
+        body = '{"text": "a", "contributor": "dad"}\n\nnot json\n{"text": "b", "contributor": "dad"}\n'
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [1])
+
+    def test_nothing_created_is_a_bad_request(self):
+        response = self.client.post(self.url, '[{"text": "x"', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Joke.objects.count(), 0)
+
+    def test_import_command_reads_in_chunks(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson') as f:
+            for i in range(7):
+                f.write(json.dumps({'text': f'joke {i}', 'contributor': 'dad'}) + '\n')
+            f.write('{"text": "no contributor"}\n')
+            f.flush()
+            out, err = StringIO(), StringIO()
+            call_command('import_jokes', f.name, chunk_size=3, stdout=out, stderr=err)
+        self.assertEqual(Joke.objects.count(), 7)
+        self.assertIn('Imported 7 jokes; rejected 1.', out.getvalue())
+        self.assertIn('item 7:', err.getvalue())
@@ -14,8 +14,10 @@ urlpatterns = [
     path('api/', random_joke_api, name='api_random_joke'),
     path('api/random', random_joke_api, name='api_random_joke_alt'),
     path('api/jokes', JokeListAPIView.as_view(), name='api_jokes'),
+    path('api/jokes/bulk', JokeBulkAPIView.as_view(), name='api_jokes_bulk'),
     path('api/joke/<int:pk>', JokeDetailAPIView.as_view(), name='api_joke_detail'),
     path('api/pictures', PictureListAPIView.as_view(), name='api_pictures'),
+    path('api/pictures/bulk', PictureBulkAPIView.as_view(), name='api_pictures_bulk'),
     path('api/picture/<int:pk>', PictureDetailAPIView.as_view(), name='api_picture_detail'),
     path('api/random_picture', random_picture_api, name='api_random_picture'),
 ]
\ No newline at end of file
@@ -1,19 +1,22 @@
+import hashlib
+from django.db.models import Count, Max
 from django.shortcuts import render
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.views.generic import DetailView
+from .bulk import import_items, parse_body
 from .models import Joke, Picture
-import random
-from rest_framework import generics
+from .pagination import NewestFirstCursorPagination
+from .selection import random_instance
+from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from .serializers import JokeSerializer, PictureSerializer
 
 def random_view(request):
     """Show one random joke and one random picture."""
-    jokes = list(Joke.objects.all())
-    pictures = list(Picture.objects.all())
-    
-    random_joke = random.choice(jokes) if jokes else None
-    random_picture = random.choice(pictures) if pictures else None
+    random_joke = random_instance(Joke)
+    random_picture = random_instance(Picture)
     
     context = {
         'joke': random_joke,
@@ -46,12 +49,44 @@ class PictureDetailView(DetailView):
     context_object_name = 'picture'
     
     
+def list_state(request, model):
+    '''
+    Return (count, newest updated_at) for model, read once per request.
+    Any create, edit or delete changes one of the two.
+    '''
+    if not hasattr(request, '_list_state'):
+        state = model.objects.aggregate(count=Count('pk'), latest=Max('updated_at'))
+        request._list_state = (state['count'], state['latest'])
+    return request._list_state
+
+def list_etag(model):
+    '''
+    Return an etag_func for a listing of model. The query string and Accept
+    header are part of the tag, since each page and field set is its own response.
+    '''
+    def etag(request, *args, **kwargs):
+        count, latest = list_state(request, model)
+        key = '|'.join([model._meta.label, str(count), latest.isoformat() if latest else '',
+                        request.GET.urlencode(), request.META.get('HTTP_ACCEPT', '')])
+        return hashlib.md5(key.encode()).hexdigest()
+    return etag
+
+def conditional_list(model):
+    '''
+    Answer a repeated GET of an unchanged listing with 304 Not Modified,
+    before any rows are read or serialized. Only the ETag is used: the newest
+    updated_at does not move when a row is deleted, so it can't be a Last-Modified.
+    '''
+    return method_decorator(condition(etag_func=list_etag(model)), name='get')
+
+@conditional_list(Joke)
 class JokeListAPIView(generics.ListCreateAPIView):
     '''
     API view to return a listing of Jokes and to create a Joke.
     '''
     queryset = Joke.objects.all()
     serializer_class = JokeSerializer
+    pagination_class = NewestFirstCursorPagination
 
 class JokeDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
     '''
@@ -60,12 +95,14 @@ class JokeDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Joke.objects.all()
     serializer_class = JokeSerializer
 
+@conditional_list(Picture)
 class PictureListAPIView(generics.ListAPIView):
     '''
     API view to return a listing of Pictures.
     '''
     queryset = Picture.objects.all()
     serializer_class = PictureSerializer
+    pagination_class = NewestFirstCursorPagination
 
 class PictureDetailAPIView(generics.RetrieveAPIView):
     '''
@@ -74,14 +111,46 @@ class PictureDetailAPIView(generics.RetrieveAPIView):
     queryset = Picture.objects.all()
     serializer_class = PictureSerializer
 
+class BulkCreateAPIView(generics.GenericAPIView):
+    '''
+    API view to create many rows from a JSON array or NDJSON (one object per
+    line) in a few INSERTs. Valid items are saved even if others are not;
+    the response gives the number created and the errors for each rejected
+    item by its position in the input.
+    '''
+    def post(self, request, *args, **kwargs):
+        try:
+            items, errors = parse_body(request.body)
+        except ValueError as exc:
+            return Response({'detail': f'Could not parse the request body: {exc}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        created, item_errors = import_items(self.get_serializer_class(), items,
+                                            self.get_serializer_context())
+        errors.update(item_errors)
+        return Response({
+            'created': created,
+            'errors': [{'index': index, 'errors': errors[index]} for index in sorted(errors)],
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST)
+
+class JokeBulkAPIView(BulkCreateAPIView):
+    '''
+    API view to create many Jokes at once.
+    '''
+    serializer_class = JokeSerializer
+
+class PictureBulkAPIView(BulkCreateAPIView):
+    '''
+    API view to create many Pictures at once.
+    '''
+    serializer_class = PictureSerializer
+
 @api_view(['GET'])
 def random_joke_api(request):
     '''
     API view to return one random joke.
     '''
-    jokes = list(Joke.objects.all())
-    if jokes:
-        random_joke = random.choice(jokes)
+    random_joke = random_instance(Joke)
+    if random_joke is not None:
         serializer = JokeSerializer(random_joke)
         return Response(serializer.data)
     return Response({})
@@ -91,9 +160,8 @@ def random_picture_api(request):
     '''
     API view to return one random picture.
     '''
-    pictures = list(Picture.objects.all())
-    if pictures:
-        random_picture = random.choice(pictures)
+    random_picture = random_instance(Picture)
+    if random_picture is not None:
         serializer = PictureSerializer(random_picture)
         return Response(serializer.data)
     return Response({})
\ No newline at end of file
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MiniInstaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mini_insta'
+
+    def ready(self):
+        # connect the signal handlers that maintain the counters, search index and follow graph
+        from . import counters, graph, search  # noqa: F401
@@ -0,0 +1,16 @@
+# file: context_processors.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Template context processors for the mini_insta application.
+
+from .views import get_current_profile
+
+
+def current_profile(request):
+    '''Expose the logged-in user's Profile to templates as current_profile.
+
+    The value is a callable, so the Profile is only looked up if a template
+    uses it (and then only once per request, shared with the views).
+    '''
+    return {'current_profile': lambda: get_current_profile(request)}
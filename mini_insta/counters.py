@@ -0,0 +1,94 @@
+# file: counters.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Maintenance of the denormalized follower, following, like and comment counters.
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Profile, Post, Follow, Comment, Like
+
+
+def adjust(model, pk, field, amount):
+    '''Atomically add amount to a counter field of one row (in the database, with F()).
+
+    The result is clamped at 0, so a counter that has drifted low cannot
+    break the delete that decrements it (reconcile_counters fixes the drift).
+    '''
+    model.objects.filter(pk=pk).update(**{field: Greatest(F(field) + amount, 0)})
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    '''Count a new Follow on both profiles.'''
+    if created:
+        adjust(Profile, instance.profile_id, 'follower_count', 1)
+        adjust(Profile, instance.follower_profile_id, 'following_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    '''Uncount a deleted Follow on both profiles.'''
+    adjust(Profile, instance.profile_id, 'follower_count', -1)
+    adjust(Profile, instance.follower_profile_id, 'following_count', -1)
+
+
+@receiver(post_save, sender=Like)
+def like_created(sender, instance, created, **kwargs):
+    '''Count a new Like on its post.'''
+    if created:
+        adjust(Post, instance.post_id, 'like_count', 1)
+
+
+@receiver(post_delete, sender=Like)
+def like_deleted(sender, instance, **kwargs):
+    '''Uncount a deleted Like on its post.'''
+    adjust(Post, instance.post_id, 'like_count', -1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    '''Count a new Comment on its post.'''
+    if created:
+        adjust(Post, instance.post_id, 'comment_count', 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    '''Uncount a deleted Comment on its post.'''
+    adjust(Post, instance.post_id, 'comment_count', -1)
+
+
+def count_of(model, field):
+    '''Return a subquery counting the rows of model whose field points at the outer row.'''
+    counts = (model.objects.filter(**{field: OuterRef('pk')})
+                           .order_by()
+                           .values(field)
+                           .annotate(count=Count('pk'))
+                           .values('count'))
+    return Coalesce(Subquery(counts), 0)
+
+
+def reconcile_counters():
+    '''Recompute every counter from the Follow, Like and Comment tables.
+
+    Returns the number of profiles and posts whose counters were wrong.
+    '''
+    follower_count = count_of(Follow, 'profile')
+    following_count = count_of(Follow, 'follower_profile')
+    like_count = count_of(Like, 'post')
+    comment_count = count_of(Comment, 'post')
+
+    # only rewrite the rows that drifted
+    profiles = (Profile.objects.annotate(actual_followers=follower_count, actual_following=following_count)
+                               .exclude(follower_count=F('actual_followers'), following_count=F('actual_following')))
+    posts = (Post.objects.annotate(actual_likes=like_count, actual_comments=comment_count)
+                         .exclude(like_count=F('actual_likes'), comment_count=F('actual_comments')))
+    fixed_profiles = Profile.objects.filter(pk__in=profiles.values('pk')).update(
+        follower_count=follower_count, following_count=following_count)
+    fixed_posts = Post.objects.filter(pk__in=posts.values('pk')).update(
+        like_count=like_count, comment_count=comment_count)
+    return fixed_profiles, fixed_posts
@@ -0,0 +1,171 @@
+# file: graph.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: In-memory follow graph for suggestions, mutual follows and follower overlap.
+
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Follow
+
+
+# Each process reloads its copy of the graph this often, to pick up follows
+# made by other processes
+GRAPH_MAX_AGE = 5 * 60
+
+
+def _insert(ids, value):
+    '''Insert value into the sorted array ids, unless it is already there.'''
+    i = bisect_left(ids, value)
+    if i == len(ids) or ids[i] != value:
+        ids.insert(i, value)
+
+
+def _discard(ids, value):
+    '''Remove value from the sorted array ids, if it is there.'''
+    i = bisect_left(ids, value)
+    if i < len(ids) and ids[i] == value:
+        del ids[i]
+
+
+def _contains(ids, value):
+    i = bisect_left(ids, value)
+    return i < len(ids) and ids[i] == value
+
+
+class FollowGraph:
+    '''Who follows whom, as sorted arrays of profile ids.
+
+    following[a] holds the ids of the profiles a follows and followers[a]
+    the ids of the profiles following a.
+    '''
+
+    def __init__(self, edges=()):
+        '''Build the graph from (follower_id, followed_id) pairs.'''
+        following = defaultdict(list)
+        followers = defaultdict(list)
+        for follower_id, profile_id in edges:
+            following[follower_id].append(profile_id)
+            followers[profile_id].append(follower_id)
+        self.following = defaultdict(lambda: array('q'),
+                                     {k: array('q', sorted(set(v))) for k, v in following.items()})
+        self.followers = defaultdict(lambda: array('q'),
+                                     {k: array('q', sorted(set(v))) for k, v in followers.items()})
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def load(cls):
+        '''Read the whole Follow table (two integer columns) in one query.'''
+        edges = Follow.objects.values_list('follower_profile_id', 'profile_id').iterator(chunk_size=10000)
+        return cls(edges)
+
+    def add(self, follower_id, profile_id):
+        '''Record that follower_id now follows profile_id.'''
+        _insert(self.following[follower_id], profile_id)
+        _insert(self.followers[profile_id], follower_id)
+
+    def remove(self, follower_id, profile_id):
+        '''Record that follower_id no longer follows profile_id.'''
+        _discard(self.following[follower_id], profile_id)
+        _discard(self.followers[profile_id], follower_id)
+
+    def get_following(self, profile_id):
+        return self.following.get(profile_id, array('q'))
+
+    def get_followers(self, profile_id):
+        return self.followers.get(profile_id, array('q'))
+
+    def is_following(self, follower_id, profile_id):
+        return _contains(self.get_following(follower_id), profile_id)
+
+    def followed_by_following(self, viewer_id, profile_id):
+        '''Return the ids of the profiles viewer follows who also follow profile ("followed by ...").'''
+        return sorted(set(self.get_following(viewer_id)).intersection(self.get_followers(profile_id)))
+
+    def common_followers(self, a, b):
+        '''Return the ids of the profiles following both a and b.'''
+        return sorted(set(self.get_followers(a)).intersection(self.get_followers(b)))
+
+    def mutual_count(self, a, b):
+        '''Return the number of profiles following both a and b.'''
+        return len(self.common_followers(a, b))
+
+    def follower_overlap(self, a, b):
+        '''Return the Jaccard similarity (0 to 1) of the followers of a and b.'''
+        followers_a = set(self.get_followers(a))
+        followers_b = set(self.get_followers(b))
+        union = len(followers_a | followers_b)
+        return len(followers_a & followers_b) / union if union else 0.0
+
+    def friends_of_friends(self, profile_id):
+        '''Return {id: n} for the profiles followed by n of the profiles profile_id follows.
+
+        Profiles profile_id already follows (and profile_id itself) are left out.
+        '''
+        following = self.get_following(profile_id)
+        counts = defaultdict(int)
+        for followed_id in following:
+            for candidate_id in self.get_following(followed_id):
+                counts[candidate_id] += 1
+        counts.pop(profile_id, None)
+        for followed_id in following:
+            counts.pop(followed_id, None)
+        return counts
+
+    def suggestions(self, profile_id, k=10):
+        '''Return up to k (id, n) pairs of profiles to follow, most shared connections first.
+
+        Ties are broken by follower count, then by id.
+        '''
+        counts = self.friends_of_friends(profile_id)
+        return heapq.nlargest(k, counts.items(),
+                              key=lambda item: (item[1], len(self.get_followers(item[0])), -item[0]))
+
+
+_graph = None
+_lock = threading.Lock()
+
+
+def get_graph():
+    '''Return this process's FollowGraph, loading it on first use and when it is too old.'''
+    global _graph
+    with _lock:
+        if _graph is None or time.monotonic() - _graph.loaded_at > GRAPH_MAX_AGE:
+            _graph = FollowGraph.load()
+        return _graph
+
+
+def reset_graph():
+    '''Forget the loaded graph; the next get_graph() reloads it.'''
+    global _graph
+    with _lock:
+        _graph = None
+
+
+def _apply(method, follower_id, profile_id):
+    '''Update the loaded graph (if any) with one follow or unfollow.'''
+    with _lock:
+        if _graph is not None:
+            getattr(_graph, method)(follower_id, profile_id)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    '''Add a new follow to the graph once it is committed.'''
+    if created:
+        transaction.on_commit(lambda: _apply('add', instance.follower_profile_id, instance.profile_id))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    '''Remove a deleted follow from the graph once it is committed.'''
+    transaction.on_commit(lambda: _apply('remove', instance.follower_profile_id, instance.profile_id))
@@ -0,0 +1,74 @@
+# file: images.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Resized variants of uploaded Photo images, generated by the upload worker.
+
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .models import Photo
+
+
+# Variant name -> maximum width in pixels (images are never scaled up)
+VARIANT_WIDTHS = {
+    'thumb': 320,
+    'feed': 640,
+    'full': 1280,
+}
+
+JPEG_QUALITY = 82
+
+
+def variant_name(photo, size):
+    '''Return the storage name for the size variant of photo's uploaded file.
+
+    The name includes the photo's pk, so photos whose files share a stem
+    (photo.png and photo.jpg) never share variant files.
+    '''
+    root, _ = os.path.splitext(photo.image_file.name)
+    return f'{root}_{photo.pk}_{size}.jpg'
+
+
+def render_variant(image, width):
+    '''Return image scaled down to at most width pixels wide, encoded as JPEG bytes.'''
+    variant = image.copy()
+    if variant.width > width:
+        height = round(variant.height * width / variant.width)
+        variant = variant.resize((width, height), Image.LANCZOS)
+    buffer = BytesIO()
+    variant.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def generate_variants(photo, force=False):
+    '''Write the resized variants of photo's uploaded file and record them on photo.
+
+    Returns False if photo has no uploaded file (URL photos are served as is)
+    or already has its variants and force is False. When the variants are
+    regenerated, only the files recorded on photo are deleted.
+    '''
+    if not photo.image_file:
+        return False
+    if photo.variants and not force:
+        return False
+
+    storage = photo.image_file.storage
+    with photo.image_file.open('rb') as original:
+        image = Image.open(original)
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+    # storage.save picks a free name if one is taken, so nothing is overwritten
+    variants = {}
+    for size, width in VARIANT_WIDTHS.items():
+        variants[size] = storage.save(variant_name(photo, size), ContentFile(render_variant(image, width)))
+
+    old_names = set((photo.variants or {}).values()) - set(variants.values())
+    Photo.objects.filter(pk=photo.pk).update(variants=variants)
+    photo.variants = variants
+    for name in old_names:
+        storage.delete(name)
+    return True
@@ -0,0 +1,37 @@
+# file: generate_photo_variants.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Management command to create the resized variants of existing uploaded photos.
+
+from django.core.management.base import BaseCommand
+
+from mini_insta.images import generate_variants
+from mini_insta.models import Photo
+
+
+class Command(BaseCommand):
+    '''Generate the thumbnail, feed and full variants of uploaded photos.'''
+
+    help = 'Create resized variants for uploaded photos that do not have them yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Regenerate the variants of every uploaded photo.')
+
+    def handle(self, *args, **options):
+        '''Generate the missing variants and report how many photos were processed.'''
+        photos = Photo.objects.exclude(image_file='')
+        if not options['force']:
+            photos = photos.filter(variants={})
+
+        done, failed = 0, 0
+        for photo in photos.iterator():
+            try:
+                generate_variants(photo, force=options['force'])
+                done += 1
+            except (OSError, ValueError) as e:
+                failed += 1
+                self.stderr.write(f'Photo {photo.pk} ({photo.image_file.name}): {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'Generated variants for {done} photos ({failed} failed).'))
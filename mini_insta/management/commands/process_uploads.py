@@ -0,0 +1,39 @@
+# file: process_uploads.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Management command that runs the worker for queued photo uploads.
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from mini_insta.tasks import requeue_stale_tasks, run_next_task
+
+
+class Command(BaseCommand):
+    '''Process queued photo uploads until stopped (or until the queue is empty with --once).'''
+
+    help = 'Attach and resize queued photo uploads. Several workers may run at once.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Exit when the queue is empty instead of waiting for more tasks.')
+        parser.add_argument('--sleep', type=float, default=2.0,
+                            help='Seconds to wait between checks of an empty queue (default 2).')
+
+    def handle(self, *args, **options):
+        '''Run tasks one at a time, waiting when there are none.'''
+        processed = 0
+        try:
+            while True:
+                requeue_stale_tasks()
+                if run_next_task():
+                    processed += 1
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} upload tasks.'))
@@ -0,0 +1,24 @@
+# file: rebuild_search_index.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Management command to refill the full-text search tables.
+
+from django.core.management.base import BaseCommand
+
+from mini_insta.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    '''Refill the post and profile search tables from the database.'''
+
+    help = 'Rebuild the full-text search index for posts and profiles.'
+
+    def handle(self, *args, **options):
+        '''Rebuild the index, or say why it cannot be built.'''
+        if rebuild_search_index():
+            self.stdout.write(self.style.SUCCESS('Rebuilt the post and profile search index.'))
+        else:
+            self.stdout.write(self.style.WARNING(
+                'Full-text search is not available on this database; search uses substring matching.'
+            ))
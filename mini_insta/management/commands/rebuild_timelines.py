@@ -0,0 +1,33 @@
+# file: rebuild_timelines.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Management command to rebuild the feed timelines from the Follow table.
+
+from django.core.management.base import BaseCommand
+
+from mini_insta.models import Profile
+from mini_insta.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    '''Rebuild the timeline of every profile (or of the given usernames).'''
+
+    help = 'Rebuild feed timelines from the profiles each profile follows.'
+
+    def add_arguments(self, parser):
+        '''Define the command line arguments.'''
+        parser.add_argument('usernames', nargs='*', help='only rebuild these profiles')
+
+    def handle(self, *args, **options):
+        '''Rebuild the timelines and print how many were rebuilt.'''
+        profiles = Profile.objects.all()
+        if options['usernames']:
+            profiles = profiles.filter(username__in=options['usernames'])
+
+        count = 0
+        for profile in profiles.iterator():
+            rebuild_timeline(profile)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} timelines.'))
@@ -0,0 +1,22 @@
+# file: reconcile_counters.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Management command to recompute the follower/following/like/comment counters.
+
+from django.core.management.base import BaseCommand
+
+from mini_insta.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    '''Recompute the denormalized counters on Profile and Post.'''
+
+    help = 'Recompute follower, following, like and comment counters from their tables.'
+
+    def handle(self, *args, **options):
+        '''Reconcile the counters and print how many rows were corrected.'''
+        fixed_profiles, fixed_posts = reconcile_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f'Corrected counters on {fixed_profiles} profiles and {fixed_posts} posts.'
+        ))
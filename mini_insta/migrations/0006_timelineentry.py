@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_timelines(apps, schema_editor):
+    '''Fill the new timelines from the existing follows.'''
+    Follow = apps.get_model('mini_insta', 'Follow')
+    Post = apps.get_model('mini_insta', 'Post')
+    TimelineEntry = apps.get_model('mini_insta', 'TimelineEntry')
+
+    for follow in Follow.objects.all():
+        posts = Post.objects.filter(profile_id=follow.profile_id).order_by('-timestamp')[:500]
+        TimelineEntry.objects.bulk_create(
+            [TimelineEntry(profile_id=follow.follower_profile_id, post_id=post.pk, timestamp=post.timestamp)
+             for post in posts],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0005_profile_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='mini_insta.post')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='mini_insta.profile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['profile', '-timestamp'], name='timeline_profile_time_idx')],
+                'constraints': [models.UniqueConstraint(fields=('profile', 'post'), name='timeline_unique_post')],
+            },
+        ),
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:16
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, field):
+    '''Return a subquery counting the rows of model whose field points at the outer row.'''
+    counts = (model.objects.filter(**{field: OuterRef('pk')})
+                           .order_by()
+                           .values(field)
+                           .annotate(count=Count('pk'))
+                           .values('count'))
+    return Coalesce(Subquery(counts), 0)
+
+
+def fill_counters(apps, schema_editor):
+    '''Set the new counters from the existing follows, likes and comments.'''
+    Profile = apps.get_model('mini_insta', 'Profile')
+    Post = apps.get_model('mini_insta', 'Post')
+    Follow = apps.get_model('mini_insta', 'Follow')
+    Like = apps.get_model('mini_insta', 'Like')
+    Comment = apps.get_model('mini_insta', 'Comment')
+
+    Profile.objects.update(follower_count=count_of(Follow, 'profile'),
+                           following_count=count_of(Follow, 'follower_profile'))
+    Post.objects.update(like_count=count_of(Like, 'post'),
+                        comment_count=count_of(Comment, 'post'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0006_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
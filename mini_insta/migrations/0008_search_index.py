@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:05
+
+from django.db import migrations
+
+
+def create_search_tables(apps, schema_editor):
+    '''Create and fill the FTS5 tables used by search (SQLite only).'''
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if not cursor.fetchone()[0]:
+            return
+        cursor.execute(
+            "CREATE VIRTUAL TABLE mini_insta_post_fts USING fts5("
+            "caption, tokenize='unicode61', prefix='2 3')"
+        )
+        cursor.execute(
+            "CREATE VIRTUAL TABLE mini_insta_profile_fts USING fts5("
+            "username, display_name, bio_text, tokenize='unicode61', prefix='2 3')"
+        )
+        cursor.execute(
+            "INSERT INTO mini_insta_post_fts (rowid, caption) "
+            "SELECT id, caption FROM mini_insta_post"
+        )
+        cursor.execute(
+            "INSERT INTO mini_insta_profile_fts (rowid, username, display_name, bio_text) "
+            "SELECT id, username, display_name, bio_text FROM mini_insta_profile"
+        )
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS mini_insta_post_fts")
+        cursor.execute("DROP TABLE IF EXISTS mini_insta_profile_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0007_denormalized_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0009_photo_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_ready',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.CreateModel(
+            name='PhotoUploadTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('files', models.JSONField(default=list)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_tasks', to='mini_insta.post')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created'], name='upload_task_queue_idx')],
+            },
+        ),
+    ]
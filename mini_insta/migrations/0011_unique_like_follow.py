@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:27
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, field):
+    '''Return a subquery counting the rows of model whose field points at the outer row.'''
+    counts = (model.objects.filter(**{field: OuterRef('pk')})
+                           .order_by()
+                           .values(field)
+                           .annotate(count=Count('pk'))
+                           .values('count'))
+    return Coalesce(Subquery(counts), 0)
+
+
+def delete_duplicates(model, fields):
+    '''Delete all but the oldest row of each group of model rows sharing the same fields.'''
+    keep = (model.objects.values(*fields)
+                         .annotate(first=Min('pk'), n=Count('pk'))
+                         .filter(n__gt=1)
+                         .values_list('first', *fields))
+    deleted = 0
+    for first, *values in keep:
+        duplicates = model.objects.filter(**dict(zip(fields, values))).exclude(pk=first)
+        deleted += duplicates.delete()[0]
+    return deleted
+
+
+def remove_duplicates(apps, schema_editor):
+    '''Remove duplicate likes and follows, then recount the counters they feed.'''
+    Profile = apps.get_model('mini_insta', 'Profile')
+    Post = apps.get_model('mini_insta', 'Post')
+    Follow = apps.get_model('mini_insta', 'Follow')
+    Like = apps.get_model('mini_insta', 'Like')
+
+    if delete_duplicates(Follow, ['profile', 'follower_profile']):
+        Profile.objects.update(follower_count=count_of(Follow, 'profile'),
+                               following_count=count_of(Follow, 'follower_profile'))
+    if delete_duplicates(Like, ['post', 'profile']):
+        Post.objects.update(like_count=count_of(Like, 'post'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0010_photo_upload_queue'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('profile', 'follower_profile'), name='follow_unique_pair'),
+        ),
+        migrations.AddConstraint(
+            model_name='like',
+            constraint=models.UniqueConstraint(fields=('post', 'profile'), name='like_unique_post_profile'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0012_follow_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='follow',
+            name='follow_profile_time_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='follow',
+            name='follow_follower_time_idx',
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', '-timestamp', '-id'], name='comment_post_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['profile', '-timestamp', '-id'], name='follow_profile_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['follower_profile', '-timestamp', '-id'], name='follow_follower_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['follower_profile', 'profile'], name='follow_follower_profile_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['profile', 'post'], name='like_profile_post_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['profile', '-timestamp', '-id'], name='post_profile_time_idx'),
+        ),
+    ]
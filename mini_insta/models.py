@@ -6,6 +6,7 @@
 
 
 from django.db import models
+from django.db.models import Prefetch
 from django.urls import reverse
 from django.contrib.auth.models import User  ## NEW
 
@@ -21,6 +22,10 @@ class Profile(models.Model):
     bio_text = models.TextField(blank=True)
     join_date = models.DateTimeField(auto_now=True)
     
+    # Counters kept up to date by mini_insta.counters (see reconcile_counters)
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    
     def __str__(self):
         return f"Post by {self.profile.username} at {self.timestamp}"
     
@@ -29,36 +34,39 @@ class Profile(models.Model):
         return reverse('show_profile', kwargs={'pk': self.pk})
     
     def get_all_posts(self):
-        '''Return all Posts for this Profile, ordered by timestamp.'''
-        posts = Post.objects.filter(profile=self).order_by('-timestamp')
+        '''Return all published Posts for this Profile, ordered by timestamp.'''
+        posts = Post.objects.filter(profile=self, is_ready=True).order_by('-timestamp')
         return posts
     
     def get_followers(self):
         '''Return a list of Profiles who follow this profile.'''
-        follows = Follow.objects.filter(profile=self)
+        follows = Follow.objects.filter(profile=self).select_related('follower_profile')
         #return list of the follower profiles 
         return [follow.follower_profile for follow in follows]
     
     def get_num_followers(self):
         '''Return the count of followers for this profile.'''
-        return len(self.get_followers())
+        return self.follower_count
     
     def get_following(self):
         '''Return a list of Profiles that this profile follows.'''
-        follows = Follow.objects.filter(follower_profile=self)
+        follows = Follow.objects.filter(follower_profile=self).select_related('profile')
         # return list of following profiles 
         return [follow.profile for follow in follows]
     
     def get_num_following(self):
         '''Return the count of profiles this profile is following.'''
-        return len(self.get_following())
+        return self.following_count
     
     def get_post_feed(self):
         '''Return a QuerySet of Posts from profiles this profile follows, ordered by most recent.'''
-        following = self.get_following()
+        # imported here to avoid a circular import (the timeline uses these models)
+        from .timeline import get_feed_post_ids
         
-        # order from most recent and get all posts from those profiles
-        posts = Post.objects.filter(profile__in=following).order_by('-timestamp')
+        # read the newest post ids from this profile's timeline, then fetch
+        # everything the feed shows for those posts up front
+        post_ids = get_feed_post_ids(self)
+        posts = Post.objects.filter(pk__in=post_ids).with_feed_data().order_by('-timestamp')
         return posts
 
     def is_following(self, other_profile):
@@ -67,6 +75,37 @@ class Profile(models.Model):
             follower_profile=self,
             profile=other_profile
         ).exists()
+    
+    def following_ids(self, among=None):
+        '''Return the set of pks of the profiles this profile follows, in one query.
+
+        If among (Profiles, pks or a QuerySet) is given, only those profiles are
+        checked, e.g. the profiles shown on one page of a list.
+        '''
+        follows = Follow.objects.filter(follower_profile=self)
+        if among is not None:
+            follows = follows.filter(profile__in=among)
+        return set(follows.values_list('profile_id', flat=True))
+
+class PostQuerySet(models.QuerySet):
+    '''QuerySet of Posts with helpers for rendering lists of posts.'''
+    
+    def visible_to(self, profile):
+        '''Return the published posts, plus profile's own posts still being processed.'''
+        if profile is None:
+            return self.filter(is_ready=True)
+        return self.filter(models.Q(is_ready=True) | models.Q(profile=profile))
+    
+    def with_feed_data(self):
+        '''Fetch what a list of posts shows (author, photos, latest comment) in a fixed number of queries.'''
+        return (self.select_related('profile')
+                    .prefetch_related(
+                        Prefetch('photo_set', queryset=Photo.objects.order_by('pk'), to_attr='prefetched_photos'),
+                        Prefetch('comment_set',
+                                 queryset=Comment.objects.select_related('profile').order_by('-timestamp', '-pk')[:1],
+                                 to_attr='latest_comments'),
+                    ))
+
 
 class Post(models.Model):
     '''The data of an Instagram post.'''
@@ -76,6 +115,21 @@ class Post(models.Model):
     caption = models.TextField(blank=True)
     timestamp = models.DateTimeField(auto_now=True)
     
+    # Counters kept up to date by mini_insta.counters (see reconcile_counters)
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    
+    # False while the post's uploaded photos are still being processed
+    is_ready = models.BooleanField(default=True)
+    
+    objects = PostQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            # a profile's posts, newest first
+            models.Index(fields=['profile', '-timestamp', '-id'], name='post_profile_time_idx'),
+        ]
+    
     def __str__(self):
         return f"Post by {self.profile.username} at {self.timestamp}"
     
@@ -88,11 +142,27 @@ class Post(models.Model):
         photos = Photo.objects.filter(post=self)
         return photos
     
+    def get_first_photo(self):
+        '''Return the first Photo for this Post, or None.'''
+        if hasattr(self, 'prefetched_photos'):  # loaded by with_feed_data()
+            return self.prefetched_photos[0] if self.prefetched_photos else None
+        return self.get_all_photos().order_by('pk').first()
+    
     def get_all_comments(self):
         '''Return all Comments for this Post, ordered by timestamp.'''
-        comments = Comment.objects.filter(post=self).order_by('-timestamp')
+        comments = Comment.objects.filter(post=self).order_by('-timestamp', '-pk')
         return comments
     
+    def get_first_comment(self):
+        '''Return the most recent Comment on this Post, or None.'''
+        if hasattr(self, 'latest_comments'):  # loaded by with_feed_data()
+            return self.latest_comments[0] if self.latest_comments else None
+        return self.get_all_comments().select_related('profile').first()
+    
+    def get_comment_count(self):
+        '''Return the number of comments on this post.'''
+        return self.comment_count
+    
     def get_likes(self):
         '''Return all Likes for this Post.'''
         likes = Like.objects.filter(post=self)
@@ -101,10 +171,18 @@ class Post(models.Model):
     def is_liked_by(self, profile):
         '''Check if this post is liked by a given profile.'''
         return Like.objects.filter(post=self, profile=profile).exists()
+    
+    @staticmethod
+    def liked_post_ids(profile, posts):
+        '''Return the set of pks of posts (Posts, pks or a QuerySet) liked by profile, in one query.'''
+        if profile is None:
+            return set()
+        likes = Like.objects.filter(profile=profile, post__in=posts)
+        return set(likes.values_list('post_id', flat=True))
 
     def get_like_count(self):
-            '''Return the number of likes on this post.'''
-            return Like.objects.filter(post=self).count()
+        '''Return the number of likes on this post.'''
+        return self.like_count
 
 
 class Photo(models.Model):
@@ -114,6 +192,7 @@ class Photo(models.Model):
     post = models.ForeignKey("Post", on_delete=models.CASCADE)
     image_url = models.URLField(blank=True)  # Keep for backwards compatibility
     image_file = models.ImageField(blank=True)  # Actual image file
+    variants = models.JSONField(default=dict, blank=True)  # size -> storage name of a resized copy
     timestamp = models.DateTimeField(auto_now=True)
     
     def __str__(self):
@@ -123,12 +202,30 @@ class Photo(models.Model):
         else:
             return f"Photo (URL) for post {self.post.pk}"
     
-    def get_image_url(self):
-        '''Return the URL to the image, either from image_url or image_file.'''
+    def get_image_url(self, size=None):
+        '''Return the URL to the image, either from image_url or image_file.
+
+        If size names a generated variant ('thumb', 'feed' or 'full'), return
+        the URL of that resized copy instead, when it exists.
+        '''
         if self.image_file:
+            if size in self.variants:
+                return self.image_file.storage.url(self.variants[size])
             return self.image_file.url
         else:
             return self.image_url
+    
+    def get_thumbnail_url(self):
+        '''Return the URL of the small version of the image, for grids.'''
+        return self.get_image_url(size='thumb')
+    
+    def get_feed_url(self):
+        '''Return the URL of the feed-width version of the image.'''
+        return self.get_image_url(size='feed')
+    
+    def get_full_url(self):
+        '''Return the URL of the large version of the image, for the post page.'''
+        return self.get_image_url(size='full')
 
 
 class Follow(models.Model):
@@ -139,6 +236,18 @@ class Follow(models.Model):
     follower_profile = models.ForeignKey("Profile", on_delete=models.CASCADE, related_name="followers")
     timestamp = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'follower_profile'], name='follow_unique_pair'),
+        ]
+        indexes = [
+            # follower and following lists, newest first
+            models.Index(fields=['profile', '-timestamp', '-id'], name='follow_profile_time_idx'),
+            models.Index(fields=['follower_profile', '-timestamp', '-id'], name='follow_follower_time_idx'),
+            # "does this profile follow these profiles?"
+            models.Index(fields=['follower_profile', 'profile'], name='follow_follower_profile_idx'),
+        ]
+    
     def __str__(self):
         '''Return a string representation of this Follow relationship.'''
         return f"{self.follower_profile.username} follows {self.profile.username}"
@@ -153,6 +262,12 @@ class Comment(models.Model):
     text = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            # a post's comments, newest first
+            models.Index(fields=['post', '-timestamp', '-id'], name='comment_post_time_idx'),
+        ]
+    
     def __str__(self):
         '''Return a string representation of this Comment.'''
         return f"Comment by {self.profile.username} on post {self.post.pk}"
@@ -166,6 +281,70 @@ class Like(models.Model):
     profile = models.ForeignKey("Profile", on_delete=models.CASCADE)
     timestamp = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'profile'], name='like_unique_post_profile'),
+        ]
+        indexes = [
+            # "which of these posts has this profile liked?"
+            models.Index(fields=['profile', 'post'], name='like_profile_post_idx'),
+        ]
+    
     def __str__(self):
         '''Return a string representation of this Like.'''
-        return f"{self.profile.username} likes post {self.post.pk}"
\ No newline at end of file
+        return f"{self.profile.username} likes post {self.post.pk}"
+
+
+class TimelineEntry(models.Model):
+    '''A Post delivered to the feed of one of its author's followers.'''
+    
+    # Data attributes
+    profile = models.ForeignKey("Profile", on_delete=models.CASCADE, related_name="timeline_entries")  # whose feed
+    post = models.ForeignKey("Post", on_delete=models.CASCADE)
+    timestamp = models.DateTimeField()  # the post's timestamp, for ordering the feed
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'post'], name='timeline_unique_post'),
+        ]
+        indexes = [
+            models.Index(fields=['profile', '-timestamp'], name='timeline_profile_time_idx'),
+        ]
+    
+    def __str__(self):
+        '''Return a string representation of this TimelineEntry.'''
+        return f"Post {self.post_id} in the feed of profile {self.profile_id}"
+
+
+class PhotoUploadTask(models.Model):
+    '''A queued job that attaches uploaded photo files to a Post (see mini_insta.tasks).'''
+    
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    
+    # Data attributes
+    post = models.ForeignKey("Post", on_delete=models.CASCADE, related_name="upload_tasks")
+    files = models.JSONField(default=list)  # storage names of the uploaded files
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            # workers take the oldest pending task
+            models.Index(fields=['status', 'created'], name='upload_task_queue_idx'),
+        ]
+    
+    def __str__(self):
+        '''Return a string representation of this task.'''
+        return f"Upload of {len(self.files)} photos for post {self.post_id} ({self.status})"
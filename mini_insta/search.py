@@ -0,0 +1,199 @@
+# file: search.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Full-text search over post captions and profiles, using SQLite FTS5 when available.
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import receiver
+
+from .models import Profile, Post
+
+
+# FTS5 tables, keyed by the pk of the row they index (as the FTS rowid)
+POST_TABLE = 'mini_insta_post_fts'
+PROFILE_TABLE = 'mini_insta_profile_fts'
+
+# Columns indexed for each model, and their bm25 weights (higher ranks first)
+POST_COLUMNS = {'caption': 1.0}
+PROFILE_COLUMNS = {'username': 10.0, 'display_name': 5.0, 'bio_text': 1.0}
+
+
+# (connection alias, database name) -> whether the search tables exist; cached
+# either way, and forgotten after migrations (which may create the tables)
+_fts_tables = {}
+
+
+def fts_enabled():
+    '''Return True if the FTS5 search tables exist in the database.'''
+    if connection.vendor != 'sqlite':
+        return False
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key not in _fts_tables:
+        _fts_tables[key] = POST_TABLE in connection.introspection.table_names()
+    return _fts_tables[key]
+
+
+@receiver(post_migrate)
+def forget_fts_tables(sender, **kwargs):
+    '''Check for the search tables again after migrations have run.'''
+    _fts_tables.clear()
+
+
+def search_terms(query):
+    '''Split a search query into words.'''
+    return re.findall(r'\w+', query)
+
+
+def match_expression(terms):
+    '''Return an FTS5 MATCH expression requiring every term, each as a prefix.'''
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+class FTSResults:
+    '''Ranked results of an FTS5 query, in a form Paginator can slice.
+
+    Only the requested slice of ids is read from the index, and only those
+    rows are loaded from the model table.
+    '''
+
+    def __init__(self, queryset, table, columns, match):
+        self.queryset = queryset
+        self.table = table
+        self.weights = ', '.join(str(weight) for weight in columns.values())
+        self.match = match
+
+    def count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {self.table} WHERE {self.table} MATCH %s', [self.match])
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def ids(self, limit, offset=0):
+        '''Return the pks of the best matches, best first.'''
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s '
+                f'ORDER BY bm25({self.table}, {self.weights}) LIMIT %s OFFSET %s',
+                [self.match, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            offset = index.start or 0
+            limit = (index.stop - offset) if index.stop is not None else -1
+            ids = self.ids(limit, offset)
+            objects = self.queryset.in_bulk(ids)
+            return [objects[pk] for pk in ids if pk in objects]
+        return self[index:index + 1][0]
+
+
+def fallback_filter(queryset, columns, terms):
+    '''Match every term (as a substring) in any of the columns, for databases without FTS5.'''
+    for term in terms:
+        any_column = Q()
+        for column in columns:
+            any_column |= Q(**{f'{column}__icontains': term})
+        queryset = queryset.filter(any_column)
+    return queryset
+
+
+def search_posts(query):
+    '''Return the Posts whose caption matches query, best matches first.'''
+    terms = search_terms(query)
+    posts = Post.objects.filter(is_ready=True).with_feed_data()
+    if not terms:
+        return posts.none()
+    if fts_enabled():
+        return FTSResults(posts, POST_TABLE, POST_COLUMNS, match_expression(terms))
+    return fallback_filter(posts, POST_COLUMNS, terms).order_by('-timestamp')
+
+
+def search_profiles(query):
+    '''Return the Profiles whose username, display name or bio matches query, best matches first.'''
+    terms = search_terms(query)
+    profiles = Profile.objects.all()
+    if not terms:
+        return profiles.none()
+    if fts_enabled():
+        return FTSResults(profiles, PROFILE_TABLE, PROFILE_COLUMNS, match_expression(terms))
+    return fallback_filter(profiles, PROFILE_COLUMNS, terms).order_by('username')
+
+
+def index_row(table, columns, instance):
+    '''Add or replace the index entry for instance.'''
+    names = ', '.join(columns)
+    params = ', '.join(['%s'] * len(columns))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [instance.pk])
+        cursor.execute(
+            f'INSERT INTO {table} (rowid, {names}) VALUES (%s, {params})',
+            [instance.pk] + [getattr(instance, column) for column in columns],
+        )
+
+
+def rebuild_search_index():
+    '''Refill both search tables from the Post and Profile tables.'''
+    if not fts_enabled():
+        return False
+    # (search table, columns, source table, which source rows to index)
+    sources = [
+        (POST_TABLE, POST_COLUMNS, Post._meta.db_table, 'is_ready'),
+        (PROFILE_TABLE, PROFILE_COLUMNS, Profile._meta.db_table, '1'),
+    ]
+    with connection.cursor() as cursor:
+        for table, columns, source, where in sources:
+            names = ', '.join(columns)
+            cursor.execute(f'DELETE FROM {table}')
+            cursor.execute(f'INSERT INTO {table} (rowid, {names}) SELECT id, {names} FROM {source} WHERE {where}')
+    return True
+
+
+def unindex_row(table, instance):
+    '''Remove the index entry for instance.'''
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [instance.pk])
+
+
+def index_post(post):
+    '''Index a published Post's caption; posts still being processed are left out.'''
+    if not fts_enabled():
+        return
+    if post.is_ready:
+        index_row(POST_TABLE, POST_COLUMNS, post)
+    else:
+        unindex_row(POST_TABLE, post)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    '''Keep a Post's caption in the search index.'''
+    index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    '''Remove a deleted Post from the search index.'''
+    if fts_enabled():
+        unindex_row(POST_TABLE, instance)
+
+
+@receiver(post_save, sender=Profile)
+def profile_saved(sender, instance, **kwargs):
+    '''Keep a Profile's names and bio in the search index.'''
+    if fts_enabled():
+        index_row(PROFILE_TABLE, PROFILE_COLUMNS, instance)
+
+
+@receiver(post_delete, sender=Profile)
+def profile_deleted(sender, instance, **kwargs):
+    '''Remove a deleted Profile from the search index.'''
+    if fts_enabled():
+        unindex_row(PROFILE_TABLE, instance)
@@ -0,0 +1,112 @@
+# file: tasks.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: A database-backed queue that attaches uploaded photos to posts in the background.
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Post, Photo, PhotoUploadTask
+from .images import generate_variants
+from .search import index_post
+from .timeline import fan_out_post
+
+
+# A task is retried this many times before it is marked failed
+MAX_ATTEMPTS = 3
+
+# A running task not updated for this long is assumed to belong to a dead worker
+STALE_AFTER = timedelta(minutes=10)
+
+
+def stage_upload(file):
+    '''Write an uploaded file to photo storage and return its storage name.'''
+    field = Photo._meta.get_field('image_file')
+    return field.storage.save(field.generate_filename(None, file.name), file)
+
+
+def enqueue_photo_upload(post, files):
+    '''Store files and queue a task to attach them to post.
+
+    post should be saved with is_ready=False, so it stays hidden until the task is done.
+    '''
+    names = [stage_upload(file) for file in files]
+    return PhotoUploadTask.objects.create(post=post, files=names)
+
+
+def requeue_stale_tasks():
+    '''Put tasks abandoned by a dead worker back in the queue (or fail them if out of attempts).'''
+    stale = PhotoUploadTask.objects.filter(status=PhotoUploadTask.RUNNING,
+                                           updated__lt=timezone.now() - STALE_AFTER)
+    stale.filter(attempts__lt=MAX_ATTEMPTS).update(status=PhotoUploadTask.PENDING, updated=timezone.now())
+    stale.update(status=PhotoUploadTask.FAILED, error='worker stopped', updated=timezone.now())
+
+
+def claim_task():
+    '''Mark the oldest pending task as running and return it, or None if the queue is empty.
+
+    The claim is a conditional UPDATE, so several workers can share the queue
+    without taking the same task.
+    '''
+    pending = (PhotoUploadTask.objects.filter(status=PhotoUploadTask.PENDING)
+                                      .order_by('created')
+                                      .values_list('pk', flat=True)[:10])
+    for pk in pending:
+        claimed = (PhotoUploadTask.objects.filter(pk=pk, status=PhotoUploadTask.PENDING)
+                                          .update(status=PhotoUploadTask.RUNNING,
+                                                  attempts=F('attempts') + 1,
+                                                  updated=timezone.now()))
+        if claimed:
+            return PhotoUploadTask.objects.select_related('post__profile').get(pk=pk)
+    return None
+
+
+def attach_photos(task):
+    '''Create the Photos for task's files (skipping any made by an earlier attempt) and resize them.'''
+    done = set(Photo.objects.filter(post_id=task.post_id, image_file__in=task.files)
+                            .values_list('image_file', flat=True))
+    with transaction.atomic():
+        photos = Photo.objects.bulk_create(
+            Photo(post_id=task.post_id, image_file=name) for name in task.files if name not in done
+        )
+
+    errors = []
+    for photo in photos:
+        try:
+            generate_variants(photo)
+        except (OSError, ValueError) as e:
+            # the original is still served; the backfill command can retry
+            errors.append(f'{photo.image_file.name}: {e}')
+    return errors
+
+
+def run_task(task):
+    '''Process a claimed task, then mark its post ready and deliver it to followers.'''
+    try:
+        errors = attach_photos(task)
+    except Exception as e:
+        status = PhotoUploadTask.PENDING if task.attempts < MAX_ATTEMPTS else PhotoUploadTask.FAILED
+        PhotoUploadTask.objects.filter(pk=task.pk).update(status=status, error=repr(e), updated=timezone.now())
+        return False
+
+    Post.objects.filter(pk=task.post_id).update(is_ready=True)
+    task.post.is_ready = True
+    index_post(task.post)
+    PhotoUploadTask.objects.filter(pk=task.pk).update(status=PhotoUploadTask.DONE,
+                                                      error='\n'.join(errors),
+                                                      updated=timezone.now())
+    fan_out_post(task.post)
+    return True
+
+
+def run_next_task():
+    '''Claim and run one task; return False if the queue was empty.'''
+    task = claim_task()
+    if task is None:
+        return False
+    run_task(task)
+    return True
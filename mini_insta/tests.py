@@ -1,3 +1,557 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Profile, Post, Photo, Follow, Comment, Like, PhotoUploadTask
+from . import timeline
+from .timeline import fan_out_post
+from .counters import reconcile_counters
+from . import search
+from .images import generate_variants, VARIANT_WIDTHS
+from .graph import FollowGraph, get_graph, reset_graph
+from cs412.pagination import KeysetPaginator, encode_cursor
+from .views import CursorListMixin, UpdatePostView, UpdateProfileView
+from PIL import Image
 
 # Create your tests here.
+
+def make_profile(username):
+    '''Create a User and a Profile for it.'''
+    user = User.objects.create_user(username=username, password='password')
+    return Profile.objects.create(
+        user=user,
+        username=username,
+        display_name=username.title(),
+        profile_image_url='https://example.com/profile.jpg',
+    )
+
+
+class PostFeedQueryTests(TestCase):
+    '''The feed should render in a fixed number of queries.'''
+
+    def setUp(self):
+        self.viewer = make_profile('viewer')
+        self.author = make_profile('author')
+        self.commenter = make_profile('commenter')
+        Follow.objects.create(profile=self.author, follower_profile=self.viewer)
+        self.client.force_login(self.viewer.user)
+
+    def add_posts(self, n):
+        '''Add n posts by author, each with photos, likes and comments.'''
+        for i in range(n):
+            post = Post.objects.create(profile=self.author, caption=f'post {i}')
+            fan_out_post(post)
+            Photo.objects.create(post=post, image_url='https://example.com/a.jpg')
+            Photo.objects.create(post=post, image_url='https://example.com/b.jpg')
+            Like.objects.create(post=post, profile=self.viewer)
+            Like.objects.create(post=post, profile=self.commenter)
+            Comment.objects.create(post=post, profile=self.commenter, text='first')
+            Comment.objects.create(post=post, profile=self.viewer, text='second')
+
+    def count_feed_queries(self):
+        '''Render the feed and return the number of queries it ran.'''
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('show_feed'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_feed_length(self):
+        self.add_posts(2)
+        short_feed = self.count_feed_queries()
+
+        self.add_posts(10)
+        long_feed = self.count_feed_queries()
+
+        self.assertEqual(short_feed, long_feed)
+
+    def test_feed_shows_counts_and_latest_comment(self):
+        self.add_posts(1)
+        post = self.viewer.get_post_feed().get()
+
+        self.assertEqual(post.get_like_count(), 2)
+        self.assertEqual(post.get_comment_count(), 2)
+        self.assertEqual(post.get_first_comment().text, 'second')
+        self.assertEqual(post.get_first_photo().image_url, 'https://example.com/a.jpg')
+
+
+class TimelineTests(TestCase):
+    '''Posts reach followers' feeds through their timelines.'''
+
+    def setUp(self):
+        self.viewer = make_profile('viewer')
+        self.author = make_profile('author')
+        self.client.force_login(self.viewer.user)
+
+    def feed_captions(self):
+        return [post.caption for post in self.viewer.get_post_feed()]
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        Follow.objects.create(profile=self.author, follower_profile=self.viewer)
+        fan_out_post(Post.objects.create(profile=self.author, caption='hello'))
+        self.assertEqual(self.feed_captions(), ['hello'])
+
+    def test_follow_backfills_and_unfollow_removes(self):
+        Post.objects.create(profile=self.author, caption='older')
+
+        self.client.post(reverse('follow', kwargs={'pk': self.author.pk}))
+        self.assertEqual(self.feed_captions(), ['older'])
+
+        self.client.post(reverse('delete_follow', kwargs={'pk': self.author.pk}))
+        self.assertEqual(self.feed_captions(), [])
+
+    def test_large_accounts_are_read_on_demand(self):
+        Follow.objects.create(profile=self.author, follower_profile=self.viewer)
+        with mock.patch.object(timeline, 'FANOUT_FOLLOWER_LIMIT', 0):
+            fan_out_post(Post.objects.create(profile=self.author, caption='big'))
+            self.assertFalse(self.viewer.timeline_entries.exists())
+            self.assertEqual(self.feed_captions(), ['big'])
+
+    def test_timeline_is_trimmed(self):
+        Follow.objects.create(profile=self.author, follower_profile=self.viewer)
+        for i in range(5):
+            fan_out_post(Post.objects.create(profile=self.author, caption=f'post {i}'))
+        # a short read (a preview) leaves the stored timeline alone
+        self.assertEqual(len(timeline.get_feed_post_ids(self.viewer, limit=2)), 2)
+        self.assertEqual(self.viewer.timeline_entries.count(), 5)
+
+        with mock.patch.object(timeline, 'TIMELINE_LENGTH', 3):
+            self.assertEqual(len(timeline.get_feed_post_ids(self.viewer)), 3)
+        self.assertEqual(self.viewer.timeline_entries.count(), 3)
+
+    def test_feed_has_no_duplicates_and_follows_edits(self):
+        Follow.objects.create(profile=self.author, follower_profile=self.viewer)
+        first = Post.objects.create(profile=self.author, caption='first')
+        fan_out_post(first)
+        fan_out_post(Post.objects.create(profile=self.author, caption='second'))
+        self.assertEqual(self.feed_captions(), ['second', 'first'])
+
+        # editing a post moves it up, although its timeline entry is older
+        first.caption = 'first, edited'
+        first.save()
+        ids = timeline.get_feed_post_ids(self.viewer)
+        self.assertEqual(ids[0], first.pk)
+
+        # the author's posts are now both in the timeline and pulled on read
+        with mock.patch.object(timeline, 'FANOUT_FOLLOWER_LIMIT', 0):
+            ids = timeline.get_feed_post_ids(self.viewer)
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(ids[0], first.pk)
+
+
+class CounterTests(TestCase):
+    '''The denormalized counters follow the Follow, Like and Comment tables.'''
+
+    def setUp(self):
+        self.viewer = make_profile('viewer')
+        self.author = make_profile('author')
+        self.post = Post.objects.create(profile=self.author, caption='hello')
+
+    def test_counters_track_creates_and_deletes(self):
+        follow = Follow.objects.create(profile=self.author, follower_profile=self.viewer)
+        like = Like.objects.create(post=self.post, profile=self.viewer)
+        Comment.objects.create(post=self.post, profile=self.viewer, text='hi')
+        self.author.refresh_from_db()
+        self.viewer.refresh_from_db()
+        self.post.refresh_from_db()
+        self.assertEqual((self.author.get_num_followers(), self.viewer.get_num_following()), (1, 1))
+        self.assertEqual((self.post.get_like_count(), self.post.get_comment_count()), (1, 1))
+
+        follow.delete()
+        like.delete()
+        self.author.refresh_from_db()
+        self.post.refresh_from_db()
+        self.assertEqual(self.author.get_num_followers(), 0)
+        self.assertEqual(self.post.get_like_count(), 0)
+
+    def test_decrement_stops_at_zero(self):
+        like = Like.objects.create(post=self.post, profile=self.viewer)
+        Post.objects.filter(pk=self.post.pk).update(like_count=0)
+        like.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+
+    def test_edits_do_not_overwrite_counters(self):
+        self.client.force_login(self.author.user)
+        # the views hold copies of the rows read before the like and follow are counted
+        stale_post = Post.objects.get(pk=self.post.pk)
+        stale_profile = Profile.objects.get(pk=self.author.pk)
+        Like.objects.create(post=self.post, profile=self.viewer)
+        Follow.objects.create(profile=self.author, follower_profile=self.viewer)
+
+        with mock.patch.object(UpdatePostView, 'get_object', return_value=stale_post):
+            self.client.post(reverse('update_post', kwargs={'pk': self.post.pk}), {'caption': 'edited'})
+        with mock.patch.object(UpdateProfileView, 'get_object', return_value=stale_profile):
+            self.client.post(reverse('update_profile'), {
+                'display_name': 'Author', 'profile_image_url': 'https://example.com/a.jpg', 'bio_text': 'hi',
+            })
+        self.post.refresh_from_db()
+        self.author.refresh_from_db()
+        self.assertEqual((self.post.caption, self.post.like_count), ('edited', 1))
+        self.assertEqual((self.author.bio_text, self.author.follower_count), ('hi', 1))
+
+    def test_reconcile_fixes_drifted_counters(self):
+        Like.objects.create(post=self.post, profile=self.viewer)
+        Post.objects.filter(pk=self.post.pk).update(like_count=7)
+        self.assertEqual(reconcile_counters(), (0, 1))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+
+
+class SearchTests(TestCase):
+    '''Search matches word prefixes and ranks the closest matches first.'''
+
+    def setUp(self):
+        self.viewer = make_profile('viewer')
+        self.author = make_profile('sunsetfan')
+        self.client.force_login(self.viewer.user)
+
+    def search(self, query):
+        response = self.client.get(reverse('search'), {'query': query})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_prefix_matches_posts_and_profiles(self):
+        Post.objects.create(profile=self.author, caption='Sunset over the harbour')
+        Post.objects.create(profile=self.author, caption='Morning coffee')
+        response = self.search('suns')
+        self.assertEqual([post.caption for post in response.context['posts']], ['Sunset over the harbour'])
+        self.assertEqual([p.username for p in response.context['profiles']], ['sunsetfan'])
+
+    def test_index_follows_edits_and_deletes(self):
+        post = Post.objects.create(profile=self.author, caption='first draft')
+        post.caption = 'final version'
+        post.save()
+        self.assertEqual(list(search.search_posts('draft')[:10]), [])
+        self.assertEqual(list(search.search_posts('final')[:10]), [post])
+        post.delete()
+        self.assertEqual(list(search.search_posts('final')[:10]), [])
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 is only used on SQLite')
+    def test_missing_tables_are_checked_once(self):
+        with mock.patch.object(search, '_fts_tables', {}), \
+             mock.patch.object(connection.introspection, 'table_names', return_value=[]) as table_names:
+            self.assertFalse(search.fts_enabled())
+            self.assertFalse(search.fts_enabled())
+        self.assertEqual(table_names.call_count, 1)
+
+    def test_results_are_paginated(self):
+        for i in range(25):
+            Post.objects.create(profile=self.author, caption=f'beach day {i}')
+        response = self.search('beach')
+        self.assertEqual(response.context['paginator'].count, 25)
+        self.assertEqual(len(response.context['posts']), 20)
+
+
+class PhotoVariantTests(TestCase):
+    '''Uploaded photos get resized variants next to the original.'''
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings = override_settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.post = Post.objects.create(profile=make_profile('author'), caption='hello')
+
+    def make_photo(self, width, height, name='photo.png', format='PNG'):
+        buffer = BytesIO()
+        Image.new('RGB', (width, height), 'red').save(buffer, format)
+        upload = SimpleUploadedFile(name, buffer.getvalue())
+        return Photo.objects.create(post=self.post, image_file=upload)
+
+    def test_variants_are_resized_and_served(self):
+        photo = self.make_photo(2000, 1000)
+        self.assertEqual(photo.get_thumbnail_url(), photo.image_file.url)
+
+        self.assertTrue(generate_variants(photo))
+        for size, width in VARIANT_WIDTHS.items():
+            with photo.image_file.storage.open(photo.variants[size]) as variant:
+                self.assertEqual(Image.open(variant).size, (width, width // 2))
+        self.assertTrue(photo.get_thumbnail_url().endswith(f'photo_{photo.pk}_thumb.jpg'))
+
+    def test_photos_sharing_a_stem_keep_their_own_variants(self):
+        png = self.make_photo(400, 200)
+        jpg = self.make_photo(200, 400, name='photo.jpg', format='JPEG')
+        generate_variants(png)
+        generate_variants(jpg)
+        old_names = set(jpg.variants.values())
+        generate_variants(jpg, force=True)
+
+        storage = png.image_file.storage
+        self.assertTrue(set(png.variants.values()).isdisjoint(jpg.variants.values()))
+        with storage.open(png.variants['thumb']) as variant:
+            self.assertEqual(Image.open(variant).size, (320, 160))
+        self.assertFalse(any(storage.exists(name) for name in old_names - set(jpg.variants.values())))
+        self.assertTrue(all(storage.exists(name) for name in jpg.variants.values()))
+
+    def test_backfill_command_skips_done_photos(self):
+        photo = self.make_photo(100, 100)
+        call_command('generate_photo_variants', stdout=StringIO())
+        photo.refresh_from_db()
+        self.assertEqual(set(photo.variants), set(VARIANT_WIDTHS))
+        self.assertFalse(generate_variants(photo))
+
+
+class PhotoUploadQueueTests(TestCase):
+    '''Creating a post queues its photos; the worker attaches them and publishes the post.'''
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings = override_settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.author = make_profile('author')
+        self.follower = make_profile('follower')
+        Follow.objects.create(profile=self.author, follower_profile=self.follower)
+        self.client.force_login(self.author.user)
+
+    def upload(self, name):
+        buffer = BytesIO()
+        Image.new('RGB', (800, 600), 'blue').save(buffer, 'PNG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+    def test_post_is_published_by_the_worker(self):
+        response = self.client.post(reverse('create_post'), {
+            'caption': 'holiday',
+            'files': [self.upload('a.png'), self.upload('b.png')],
+        })
+        self.assertEqual(response.status_code, 302)
+
+        post = Post.objects.get(caption='holiday')
+        self.assertFalse(post.is_ready)
+        self.assertFalse(post.photo_set.exists())
+        self.assertEqual(self.follower.get_post_feed().count(), 0)
+
+        # only the author sees the unfinished post
+        show_post = reverse('show_post', kwargs={'pk': post.pk})
+        show_profile = reverse('show_profile', kwargs={'pk': self.author.pk})
+        self.assertEqual(len(self.client.get(show_profile).context['page']), 1)
+        self.client.force_login(self.follower.user)
+        self.assertEqual(self.client.get(show_post).status_code, 404)
+        self.assertEqual(len(self.client.get(show_profile).context['page']), 0)
+        self.assertEqual(list(search.search_posts('holiday')[:10]), [])
+
+        call_command('process_uploads', once=True, stdout=StringIO())
+
+        post.refresh_from_db()
+        self.assertTrue(post.is_ready)
+        self.assertEqual(post.photo_set.count(), 2)
+        self.assertTrue(all(photo.variants for photo in post.photo_set.all()))
+        self.assertEqual(post.upload_tasks.get().status, PhotoUploadTask.DONE)
+        self.assertEqual(list(self.follower.get_post_feed()), [post])
+        self.assertEqual(self.client.get(show_post).status_code, 200)
+        self.assertEqual(list(search.search_posts('holiday')[:10]), [post])
+
+
+class BatchStateTests(TestCase):
+    '''Follow and like state for a whole list is read in one query.'''
+
+    def setUp(self):
+        self.viewer = make_profile('viewer')
+        self.others = [make_profile(f'user{i}') for i in range(5)]
+        self.posts = [Post.objects.create(profile=other, caption='hi') for other in self.others]
+        for other in self.others[:2]:
+            Follow.objects.create(profile=other, follower_profile=self.viewer)
+        Like.objects.create(post=self.posts[3], profile=self.viewer)
+        self.client.force_login(self.viewer.user)
+
+    def test_bulk_lookups_use_one_query(self):
+        with self.assertNumQueries(1):
+            following = self.viewer.following_ids(among=self.others)
+        with self.assertNumQueries(1):
+            liked = Post.liked_post_ids(self.viewer, self.posts)
+        self.assertEqual(following, {self.others[0].pk, self.others[1].pk})
+        self.assertEqual(liked, {self.posts[3].pk})
+
+    def test_profile_list_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(reverse('show_all_profiles'))
+        for i in range(5, 10):
+            Follow.objects.create(profile=make_profile(f'user{i}'), follower_profile=self.viewer)
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get(reverse('show_all_profiles'))
+        self.assertEqual(len(before), len(after))
+        self.assertEqual(len(response.context['following_ids']), 7)
+
+    def test_detail_pages_show_state(self):
+        response = self.client.get(reverse('show_post', kwargs={'pk': self.posts[3].pk}))
+        self.assertTrue(response.context['is_liked'])
+        response = self.client.get(reverse('show_profile', kwargs={'pk': self.others[0].pk}))
+        self.assertTrue(response.context['is_following'])
+        self.assertContains(response, 'Unfollow')
+
+
+class CurrentProfileTests(TestCase):
+    '''The logged-in user's Profile is looked up once per request.'''
+
+    def setUp(self):
+        self.viewer = make_profile('viewer')
+        self.client.force_login(self.viewer.user)
+
+    def count_profile_lookups(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return sum('"mini_insta_profile"."user_id" =' in query['sql'] for query in queries)
+
+    def test_views_resolve_the_profile_once(self):
+        for name in ['create_post', 'show_feed', 'show_profile_self']:
+            with self.subTest(name):
+                self.assertEqual(self.count_profile_lookups(reverse(name)), 1)
+        self.assertEqual(self.count_profile_lookups(reverse('search') + '?query=hello'), 1)
+
+    def test_user_without_profile_gets_404(self):
+        self.client.force_login(User.objects.create_user(username='nobody', password='password'))
+        self.assertEqual(self.client.get(reverse('show_feed')).status_code, 404)
+
+
+class FollowGraphTests(TestCase):
+    '''The follow graph answers suggestion and mutual queries and follows changes.'''
+
+    def test_queries(self):
+        # 1 follows 2 and 3; 2 and 3 both follow 4; 3 follows 5; 6 follows 4
+        graph = FollowGraph([(1, 2), (1, 3), (2, 4), (3, 4), (3, 5), (6, 4), (6, 5)])
+        self.assertEqual(graph.suggestions(1), [(4, 2), (5, 1)])
+        self.assertEqual(graph.followed_by_following(1, 4), [2, 3])
+        self.assertEqual(graph.mutual_count(4, 5), 2)
+        self.assertEqual(graph.follower_overlap(4, 5), 2 / 3)
+
+        graph.add(1, 4)
+        graph.remove(3, 5)
+        self.assertEqual(graph.suggestions(1), [])
+        self.assertEqual(list(graph.get_followers(5)), [6])
+
+    def test_graph_follows_the_follow_table(self):
+        reset_graph()
+        self.addCleanup(reset_graph)
+        viewer, a, b = make_profile('viewer'), make_profile('a'), make_profile('b')
+        Follow.objects.create(profile=a, follower_profile=viewer)
+        self.assertEqual(get_graph().suggestions(viewer.pk), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            follow = Follow.objects.create(profile=b, follower_profile=a)
+        self.assertEqual(get_graph().suggestions(viewer.pk), [(b.pk, 1)])
+
+        self.client.force_login(viewer.user)
+        response = self.client.get(reverse('show_profile_self'))
+        self.assertEqual(response.context['suggestions'], [b])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            follow.delete()
+        self.assertEqual(get_graph().suggestions(viewer.pk), [])
+
+
+class IdempotentActionTests(TestCase):
+    '''Liking and following twice has the effect of doing it once.'''
+
+    def setUp(self):
+        self.viewer = make_profile('viewer')
+        self.author = make_profile('author')
+        self.post = Post.objects.create(profile=self.author, caption='hello')
+        self.client.force_login(self.viewer.user)
+
+    def test_repeated_like_is_stored_once(self):
+        url = reverse('like', kwargs={'pk': self.post.pk})
+        for _ in range(2):
+            response = self.client.post(url, headers={'x-requested-with': 'XMLHttpRequest'})
+            self.assertEqual(response.json(), {'liked': True, 'count': 1})
+        self.assertEqual(Like.objects.filter(post=self.post).count(), 1)
+
+        response = self.client.post(reverse('delete_like', kwargs={'pk': self.post.pk}),
+                                    headers={'accept': 'application/json'})
+        self.assertEqual(response.json(), {'liked': False, 'count': 0})
+
+    def test_repeated_follow_is_stored_once(self):
+        url = reverse('follow', kwargs={'pk': self.author.pk})
+        self.assertRedirects(self.client.post(url), reverse('show_profile', kwargs={'pk': self.author.pk}))
+        response = self.client.post(url, headers={'x-requested-with': 'XMLHttpRequest'})
+        self.assertEqual(response.json(), {'following': True, 'count': 1})
+        self.assertEqual(Follow.objects.filter(profile=self.author).count(), 1)
+
+    def test_database_rejects_duplicates(self):
+        Like.objects.create(post=self.post, profile=self.viewer)
+        with self.assertRaises(IntegrityError):
+            Like.objects.create(post=self.post, profile=self.viewer)
+
+
+class CursorPaginationTests(TestCase):
+    '''Long lists are shown a page at a time, by cursor.'''
+
+    def setUp(self):
+        self.author = make_profile('author')
+        for i in range(7):
+            Post.objects.create(profile=self.author, caption=f'post {i}')
+
+    def test_pages_cover_every_row_once(self):
+        paginator = KeysetPaginator(Post.objects.filter(profile=self.author), 3, ('-timestamp', '-pk'))
+        seen, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            seen += [post.pk for post in page]
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        expected = list(Post.objects.order_by('-timestamp', '-pk').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_bad_cursor_starts_at_the_top(self):
+        paginator = KeysetPaginator(Post.objects.all(), 3, ('-timestamp', '-pk'))
+        self.assertEqual(len(paginator.page('not-a-cursor')), 3)
+        # well-formed cursors holding values of the wrong type
+        for values in (['2020-01-01T00:00:00', {}], ['x', 'y']):
+            with self.subTest(values):
+                self.assertEqual(len(paginator.page(encode_cursor('next', values))), 3)
+
+    @mock.patch.object(CursorListMixin, 'per_page', 5)
+    def test_infinite_scroll_json(self):
+        url = reverse('show_profile', kwargs={'pk': self.author.pk})
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['page']), 5)
+
+        response = self.client.get(response.context['next_page_url'], headers={'accept': 'application/json'})
+        data = response.json()
+        self.assertEqual(data['html'].count('class="post-item"'), 2)
+        self.assertIsNone(data['next'])
+
+    @mock.patch.object(CursorListMixin, 'per_page', 2)
+    def test_follower_list_is_paginated(self):
+        for i in range(3):
+            Follow.objects.create(profile=self.author, follower_profile=make_profile(f'fan{i}'))
+        response = self.client.get(reverse('show_followers', kwargs={'pk': self.author.pk}))
+        self.assertEqual([p.username for p in response.context['profiles']], ['fan2', 'fan1'])
+        self.assertContains(response, 'data-infinite-next')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'query plans are checked on SQLite')
+class HotPathQueryPlanTests(TestCase):
+    '''The feed, profile and post page queries should read an index, in order.'''
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(index, plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_lists_are_read_in_index_order(self):
+        newest = ('-timestamp', '-pk')
+        self.assertUsesIndex(Post.objects.filter(profile_id=1).order_by(*newest)[:21], 'post_profile_time_idx')
+        self.assertUsesIndex(Comment.objects.filter(post_id=1).order_by(*newest)[:21], 'comment_post_time_idx')
+        self.assertUsesIndex(Follow.objects.filter(profile_id=1).order_by(*newest)[:21], 'follow_profile_time_idx')
+        self.assertUsesIndex(Follow.objects.filter(follower_profile_id=1).order_by(*newest)[:21],
+                             'follow_follower_time_idx')
+
+    def test_state_lookups_use_covering_indexes(self):
+        # either the (follower, profile) index or the unique pair constraint answers these
+        self.assertUsesIndex(Follow.objects.filter(follower_profile_id=1, profile_id__in=[2, 3])
+                                           .values_list('profile_id'), 'COVERING INDEX')
+        self.assertUsesIndex(Like.objects.filter(profile_id=1, post_id__in=[2, 3])
+                                         .values_list('post_id'), 'COVERING INDEX')
@@ -0,0 +1,99 @@
+# file: timeline.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Fan-out-on-write timelines that back each profile's post feed.
+
+from .models import Profile, Post, Follow, TimelineEntry
+
+
+# Number of posts kept in (and read from) each profile's timeline
+TIMELINE_LENGTH = 500
+
+# Authors with more followers than this are not fanned out on write; their
+# posts are merged into their followers' feeds when the feed is read
+FANOUT_FOLLOWER_LIMIT = 1000
+
+
+def is_fanned_out(author):
+    '''Return True if author's posts are pushed into their followers' timelines.'''
+    # read the counter from the database; the author instance may be stale
+    follower_count = Profile.objects.filter(pk=author.pk).values_list('follower_count', flat=True).first()
+    return (follower_count or 0) <= FANOUT_FOLLOWER_LIMIT
+
+
+def fan_out_post(post):
+    '''Deliver a new post to the timelines of its author's followers.'''
+    if not is_fanned_out(post.profile):
+        return
+    follower_ids = Follow.objects.filter(profile=post.profile).values_list('follower_profile_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(profile_id=follower_id, post=post, timestamp=post.timestamp) for follower_id in follower_ids),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_timeline(follower, author):
+    '''Add author's recent posts to follower's timeline (after a new follow).'''
+    if not is_fanned_out(author):
+        return
+    posts = (Post.objects.filter(profile=author, is_ready=True)
+                         .order_by('-timestamp')
+                         .values_list('pk', 'timestamp')[:TIMELINE_LENGTH])
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(profile=follower, post_id=pk, timestamp=timestamp) for pk, timestamp in posts),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def remove_from_timeline(follower, author):
+    '''Remove author's posts from follower's timeline (after an unfollow).'''
+    TimelineEntry.objects.filter(profile=follower, post__profile=author).delete()
+
+
+def rebuild_timeline(profile):
+    '''Rebuild profile's timeline from the profiles it follows.'''
+    TimelineEntry.objects.filter(profile=profile).delete()
+    for follow in Follow.objects.filter(follower_profile=profile).select_related('profile'):
+        backfill_timeline(profile, follow.profile)
+
+
+def trim_timeline(profile, oldest_kept):
+    '''Delete the entries older than oldest_kept from profile's timeline.'''
+    TimelineEntry.objects.filter(profile=profile, timestamp__lt=oldest_kept).delete()
+
+
+def get_feed_post_ids(profile, limit=None):
+    '''Return the ids of the newest posts in profile's feed (at most limit), newest first.
+
+    Reads a bounded, pre-sorted slice of the profile's timeline and merges
+    in the recent posts of followed authors too large to fan out. Posts are
+    ordered by their current timestamp, which moves when a post is edited.
+    A full-length read also trims the stored timeline to TIMELINE_LENGTH.
+    '''
+    if limit is None:
+        limit = TIMELINE_LENGTH
+    trim = limit >= TIMELINE_LENGTH
+    rows = list(TimelineEntry.objects.filter(profile=profile)
+                                     .order_by('-timestamp')
+                                     .values_list('post_id', 'post__timestamp', 'timestamp')
+                                     [:TIMELINE_LENGTH + 1 if trim else limit])
+    if trim and len(rows) > TIMELINE_LENGTH:
+        rows = rows[:TIMELINE_LENGTH]
+        trim_timeline(profile, rows[-1][2])
+
+    # hybrid fallback: pull the posts of large accounts this profile follows
+    large_authors = (Profile.objects.filter(followed__follower_profile=profile,
+                                            follower_count__gt=FANOUT_FOLLOWER_LIMIT)
+                                    .values('pk'))
+    pulled = (Post.objects.filter(profile__in=large_authors, is_ready=True)
+                          .order_by('-timestamp')
+                          .values_list('pk', 'timestamp')[:limit])
+
+    # a post can be in both (its author grew past the limit after fanning it out)
+    timestamps = {post_id: timestamp for post_id, timestamp, _ in rows}
+    timestamps.update(pulled)
+    merged = sorted(timestamps, key=lambda post_id: (timestamps[post_id], post_id), reverse=True)
+    return merged[:limit]
@@ -5,8 +5,13 @@
 # description: View classes for mini_insta application including list views, detail views, create/update/delete views, and search functionality.
 
 from django.shortcuts import render
-from .models import Profile, Post, Photo, Follow, Comment, Like
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from .models import Profile, Post, Follow, Like
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
+from .timeline import fan_out_post, backfill_timeline, remove_from_timeline
+from .search import search_posts, search_profiles
+from .tasks import enqueue_photo_upload
+from .graph import get_graph
+from cs412.pagination import KeysetPaginator
 from .forms import CreatePostForm, UpdateProfileForm, UpdatePostForm, CreateProfileForm  ## UPDATED: Added CreateProfileForm
 from django.urls import reverse
 from django.contrib.auth.mixins import LoginRequiredMixin  ## NEW for Task 1
@@ -14,31 +19,181 @@ from django.contrib.auth.forms import UserCreationForm  ## NEW for Task 3
 from django.contrib.auth.models import User  ## NEW for Task 3
 from django.contrib.auth import login  ## NEW for Task 3
 from django.shortcuts import redirect, get_object_or_404
+from django.http import Http404, JsonResponse
+from django.template.loader import render_to_string
 from django.views import View
 
 
-class ProfileListView(ListView):
-    '''Create a subclass of ListView to display all profiles.'''
-    model = Profile
+def get_current_profile(request):
+    '''Return the Profile of the logged-in user, or None.
+
+    The lookup runs at most once per request; the result is kept on the request.
+    '''
+    if not hasattr(request, '_current_profile'):
+        if request.user.is_authenticated:
+            request._current_profile = Profile.objects.filter(user=request.user).first()
+        else:
+            request._current_profile = None
+    return request._current_profile
+
+
+class LoggedInProfileMixin(LoginRequiredMixin):
+    '''Require a logged-in user and give access to their Profile.'''
+
+    def get_login_url(self):
+        '''Return the URL required for login.'''
+        return reverse('login')
+
+    def get_logged_in_profile(self):
+        '''Return the logged-in user's Profile (404 if they do not have one).'''
+        profile = get_current_profile(self.request)
+        if profile is None:
+            raise Http404('No profile for this user.')
+        return profile
+
+
+class SaveFormFieldsMixin:
+    '''Save only the fields on the form (and auto_now timestamps) when it is valid.
+
+    A full save would write the instance's in-memory counters back over any
+    concurrent F() updates to them (see mini_insta.counters).
+    '''
+
+    def form_valid(self, form):
+        '''Save the form's fields and redirect to the success URL.'''
+        self.object = form.save(commit=False)
+        auto_now = [field.name for field in self.object._meta.concrete_fields if getattr(field, 'auto_now', False)]
+        self.object.save(update_fields=[*form._meta.fields, *auto_now])
+        return redirect(self.get_success_url())
+
+
+class CursorListMixin:
+    '''Show one page of a list at a time, paginated by cursor.
+
+    Further pages are requested with ?cursor=...; a JavaScript (infinite
+    scroll) request gets {"html": ..., "next": ...} with just the new items,
+    rendered with list_template_name.
+    '''
+    
+    per_page = 20
+    list_queryset = None
+    list_ordering = ('-timestamp', '-pk')
+    list_template_name = None
+    
+    def get_list_queryset(self):
+        '''Return the QuerySet to paginate (list_queryset, unless overridden).'''
+        return self.list_queryset.all()
+    
+    def get_list_context(self, page):
+        '''Return the extra context the list items need (e.g. follow badges).'''
+        return {}
+    
+    def get_page_context(self):
+        '''Return the context for the current page of the list.'''
+        paginator = KeysetPaginator(self.get_list_queryset(), self.per_page, self.list_ordering)
+        page = paginator.page(self.request.GET.get('cursor'))
+        next_page_url = None
+        if page.has_next():
+            params = self.request.GET.copy()
+            params['cursor'] = page.next_cursor
+            next_page_url = f'{self.request.path}?{params.urlencode()}'
+        return {'page': page, 'next_page_url': next_page_url, **self.get_list_context(page)}
+    
+    def get_context_data(self, **kwargs):
+        '''Add the current page of the list.'''
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_page_context())
+        return context
+    
+    def render_to_response(self, context, **response_kwargs):
+        '''Return only the new items as JSON for infinite scroll requests.'''
+        if wants_json(self.request):
+            html = render_to_string(self.list_template_name, context, request=self.request)
+            return JsonResponse({'html': html, 'next': context['next_page_url']})
+        return super().render_to_response(context, **response_kwargs)
+
+
+class ProfileListView(CursorListMixin, TemplateView):
+    '''Display the directory of all profiles, a page at a time.'''
     template_name = 'mini_insta/show_all_profiles.html'
-    context_object_name = 'profiles'
+    list_template_name = 'mini_insta/partials/profile_cards.html'
+    list_queryset = Profile.objects.all()
+    list_ordering = ('username',)
+    
+    def get_list_context(self, page):
+        '''Add the pks of the listed profiles the logged-in user follows.'''
+        viewer = get_current_profile(self.request)
+        return {'following_ids': viewer.following_ids(among=page.object_list) if viewer else set()}
 
 
-class ProfileDetailView(DetailView):
-    '''Show the details for one profile.'''
+class ProfileDetailView(CursorListMixin, DetailView):
+    '''Show the details for one profile, with a page of their posts.'''
     model = Profile
     template_name = 'mini_insta/show_profile.html'
     context_object_name = 'profile'
+    list_template_name = 'mini_insta/partials/post_tiles.html'
+    
+    def get_list_queryset(self):
+        posts = Post.objects.filter(profile=self.object).visible_to(get_current_profile(self.request))
+        return posts.with_feed_data()
+    
+    def get_object(self, queryset=None):
+        '''Return the Profile in the URL, or the logged-in user's own Profile.'''
+        if 'pk' in self.kwargs:
+            return super().get_object(queryset)
+        profile = get_current_profile(self.request)
+        if profile is None:
+            raise Http404('No profile for this user.')
+        return profile
+    
+    # how many suggestions / mutual follows to show
+    suggestion_limit = 5
+    
+    def get_context_data(self, **kwargs):
+        '''Add whether the logged-in user follows this profile, and follow-graph details.'''
+        context = super().get_context_data(**kwargs)
+        viewer = get_current_profile(self.request)
+        context['is_following'] = bool(viewer) and self.object.pk in viewer.following_ids(among=[self.object])
+        
+        if viewer is not None:
+            graph = get_graph()
+            if viewer.pk == self.object.pk:
+                # people you may know: followed by the most of the profiles you follow
+                ranked = [pk for pk, count in graph.suggestions(viewer.pk, k=self.suggestion_limit)]
+                profiles = Profile.objects.in_bulk(ranked)
+                context['suggestions'] = [profiles[pk] for pk in ranked if pk in profiles]
+            else:
+                # "followed by ...": profiles you follow who follow this one
+                mutual_ids = graph.followed_by_following(viewer.pk, self.object.pk)
+                followed_by = list(Profile.objects.filter(pk__in=mutual_ids[:self.suggestion_limit]))
+                context['followed_by'] = followed_by
+                context['followed_by_others'] = len(mutual_ids) - len(followed_by)
+        return context
 
 
-class PostDetailView(DetailView):
-    '''Show the details for one post.'''
+class PostDetailView(CursorListMixin, DetailView):
+    '''Show the details for one post, with a page of its comments.'''
     model = Post
     template_name = 'mini_insta/show_post.html'
     context_object_name = 'post'
+    list_template_name = 'mini_insta/partials/comments.html'
+    
+    def get_queryset(self):
+        '''Only the author can see a post whose photos are still being processed.'''
+        return Post.objects.visible_to(get_current_profile(self.request))
+    
+    def get_list_queryset(self):
+        return self.object.get_all_comments().select_related('profile')
+    
+    def get_context_data(self, **kwargs):
+        '''Add whether the logged-in user likes this post.'''
+        context = super().get_context_data(**kwargs)
+        viewer = get_current_profile(self.request)
+        context['is_liked'] = self.object.pk in Post.liked_post_ids(viewer, [self.object])
+        return context
 
 
-class CreatePostView(LoginRequiredMixin, CreateView):  ## UPDATED: Added LoginRequiredMixin
+class CreatePostView(LoggedInProfileMixin, CreateView):  ## UPDATED: Added LoginRequiredMixin
     '''A view to create a new Post and save it to the database.'''
     
     form_class = CreatePostForm
@@ -54,43 +209,47 @@ class CreatePostView(LoginRequiredMixin, CreateView):  ## UPDATED: Added LoginRe
         context = super().get_context_data(**kwargs)
         
         # Get the profile of the logged-in user
-        profile = Profile.objects.get(user=self.request.user)  ## UPDATED: Use logged-in user
+        profile = self.get_logged_in_profile()
         
         context['profile'] = profile
         return context
     
     def form_valid(self, form):
-        '''Handle the form submission and save the Post and Photo to the database.'''
+        '''Handle the form submission: save the Post and queue its photos.'''
         
         # Get the profile of the logged-in user
-        profile = Profile.objects.get(user=self.request.user)  ## UPDATED: Use logged-in user
+        profile = self.get_logged_in_profile()
         
         # Attach profile to the post by foreign key 
         form.instance.profile = profile
         
-        # Save the post to get a pk
-        post = form.save()
-        
         # Read the files from the request
         files = self.request.FILES.getlist('files')
         
-        # Create a photo object for each uploaded file
-        for file in files:
-            photo = Photo()
-            photo.post = post
-            photo.image_file = file
-            photo.save()
+        # A post with photos stays hidden until the worker has processed them
+        form.instance.is_ready = not files
+        
+        # Save the post
+        response = super().form_valid(form)
+        
+        if files:
+            # Store the files now; a worker (process_uploads) creates the Photos,
+            # resizes them and then delivers the post to followers
+            enqueue_photo_upload(self.object, files)
+        else:
+            # Push the new post into the feeds of this profile's followers
+            fan_out_post(self.object)
         
-        return super().form_valid(form)
+        return response
     
     def get_success_url(self):
         '''Return the URL to redirect to after successfully submitting form.'''
         # Go back to the logged-in user's profile page
-        profile = Profile.objects.get(user=self.request.user)  ## UPDATED
+        profile = self.get_logged_in_profile()
         return reverse('show_profile', kwargs={'pk': profile.pk})
     
 
-class UpdateProfileView(LoginRequiredMixin, UpdateView):  ## UPDATED: Added LoginRequiredMixin
+class UpdateProfileView(LoggedInProfileMixin, SaveFormFieldsMixin, UpdateView):  ## UPDATED: Added LoginRequiredMixin
     '''A view to update a Profile and save it to the database.'''
     
     form_class = UpdateProfileForm
@@ -103,7 +262,7 @@ class UpdateProfileView(LoginRequiredMixin, UpdateView):  ## UPDATED: Added Logi
     
     def get_object(self):  ## NEW: Override to get Profile from logged-in user
         '''Return the Profile object for the logged-in user.'''
-        return Profile.objects.get(user=self.request.user)
+        return self.get_logged_in_profile()
 
 
 class DeletePostView(LoginRequiredMixin, DeleteView):  ## UPDATED: Added LoginRequiredMixin
@@ -137,7 +296,7 @@ class DeletePostView(LoginRequiredMixin, DeleteView):  ## UPDATED: Added LoginRe
         return reverse('show_profile', kwargs={'pk': post.profile.pk})
 
 
-class UpdatePostView(LoginRequiredMixin, UpdateView):  ## UPDATED: Added LoginRequiredMixin
+class UpdatePostView(LoginRequiredMixin, SaveFormFieldsMixin, UpdateView):  ## UPDATED: Added LoginRequiredMixin
     '''A view to update a Post and save it to the database.'''
     
     form_class = UpdatePostForm
@@ -150,21 +309,43 @@ class UpdatePostView(LoginRequiredMixin, UpdateView):  ## UPDATED: Added LoginRe
         return reverse('login')
 
 
-class ShowFollowersDetailView(DetailView):
-    '''View to show all followers of a profile.'''
+class ShowFollowersDetailView(CursorListMixin, DetailView):
+    '''View to show the followers of a profile, newest first.'''
     model = Profile
     template_name = 'mini_insta/show_followers.html'
     context_object_name = 'profile'
+    list_template_name = 'mini_insta/partials/profile_rows.html'
+    
+    def get_list_queryset(self):
+        return Follow.objects.filter(profile=self.object).select_related('follower_profile')
+    
+    def get_list_context(self, page):
+        '''Add the listed followers, and which of them the logged-in user follows.'''
+        profiles = [follow.follower_profile for follow in page]
+        viewer = get_current_profile(self.request)
+        return {'profiles': profiles,
+                'following_ids': viewer.following_ids(among=profiles) if viewer else set()}
 
 
-class ShowFollowingDetailView(DetailView):
-    '''View to show all profiles that this profile follows.'''
+class ShowFollowingDetailView(CursorListMixin, DetailView):
+    '''View to show the profiles that this profile follows, newest first.'''
     model = Profile
     template_name = 'mini_insta/show_following.html'
     context_object_name = 'profile'
+    list_template_name = 'mini_insta/partials/profile_rows.html'
+    
+    def get_list_queryset(self):
+        return Follow.objects.filter(follower_profile=self.object).select_related('profile')
+    
+    def get_list_context(self, page):
+        '''Add the listed profiles, and which of them the logged-in user follows.'''
+        profiles = [follow.profile for follow in page]
+        viewer = get_current_profile(self.request)
+        return {'profiles': profiles,
+                'following_ids': viewer.following_ids(among=profiles) if viewer else set()}
 
 
-class PostFeedListView(LoginRequiredMixin, ListView):  ## UPDATED: Added LoginRequiredMixin
+class PostFeedListView(LoggedInProfileMixin, ListView):  ## UPDATED: Added LoginRequiredMixin
     '''View to show the post feed for a profile (posts from profiles they follow).'''
     model = Post
     template_name = 'mini_insta/show_feed.html'
@@ -177,7 +358,7 @@ class PostFeedListView(LoginRequiredMixin, ListView):  ## UPDATED: Added LoginRe
     def get_queryset(self):
         '''Get the posts for the feed - posts from profiles this profile follows.'''
         # Get the profile of the logged-in user
-        profile = Profile.objects.get(user=self.request.user)  ## UPDATED: Use logged-in user
+        profile = self.get_logged_in_profile()
         
         # Get the post feed for this profile
         return profile.get_post_feed()
@@ -187,17 +368,22 @@ class PostFeedListView(LoginRequiredMixin, ListView):  ## UPDATED: Added LoginRe
         context = super().get_context_data(**kwargs)
         
         # Get the profile of the logged-in user
-        profile = Profile.objects.get(user=self.request.user)  ## UPDATED: Use logged-in user
+        profile = self.get_logged_in_profile()
         context['profile'] = profile
         
+        # Which of the posts the user has liked, in one query
+        context['liked_post_ids'] = Post.liked_post_ids(profile, list(context['posts']))
+        
         return context
 
 
-class SearchView(LoginRequiredMixin, ListView):  ## UPDATED: Added LoginRequiredMixin
+class SearchView(LoggedInProfileMixin, ListView):  ## UPDATED: Added LoginRequiredMixin
     '''View to search for profiles and posts.'''
     model = Post
     template_name = 'mini_insta/search_results.html'
     context_object_name = 'posts'
+    paginate_by = 20
+    profile_limit = 20
     
     def get_login_url(self):  ## NEW
         '''Return the URL required for login.'''
@@ -209,7 +395,7 @@ class SearchView(LoginRequiredMixin, ListView):  ## UPDATED: Added LoginRequired
         # Check if 'query' is in the GET parameters
         if 'query' not in request.GET or not request.GET['query']:
             # No query yet, show the search form
-            profile = Profile.objects.get(user=self.request.user)  ## UPDATED: Use logged-in user
+            profile = self.get_logged_in_profile()
             context = {'profile': profile}
             return render(request, 'mini_insta/search.html', context)
         
@@ -217,35 +403,30 @@ class SearchView(LoginRequiredMixin, ListView):  ## UPDATED: Added LoginRequired
         return super().dispatch(request, *args, **kwargs)
     
     def get_queryset(self):
-        '''Get posts that match the search query.'''
+        '''Get posts that match the search query, best matches first.'''
         query = self.request.GET.get('query', '')
-        
-        # Filter posts where caption contains the query
-        posts = Post.objects.filter(caption__icontains=query)
-        return posts
+        return search_posts(query)
     
     def get_context_data(self, **kwargs):
         '''Add profile, query, and matching profiles to context.'''
         context = super().get_context_data(**kwargs)
         
         # Get the profile of the logged-in user
-        profile = Profile.objects.get(user=self.request.user)  ## UPDATED: Use logged-in user
+        profile = self.get_logged_in_profile()
         context['profile'] = profile
         
         # Get the query
         query = self.request.GET.get('query', '')
         context['query'] = query
         
-        # Get matching profiles (search in username, display_name, and bio_text)
-        profiles = Profile.objects.filter(
-            username__icontains=query
-        ) | Profile.objects.filter(
-            display_name__icontains=query
-        ) | Profile.objects.filter(
-            bio_text__icontains=query
-        )
+        # Get the best matching profiles (by username, display_name, and bio_text)
+        profiles = list(search_profiles(query)[:self.profile_limit])
         context['profiles'] = profiles
         
+        # Which of the results the user follows or has liked, one query each
+        context['following_ids'] = profile.following_ids(among=profiles)
+        context['liked_post_ids'] = Post.liked_post_ids(profile, list(context['posts']))
+        
         return context
 
 
@@ -299,120 +480,127 @@ class CreateProfileView(CreateView):  ## NEW for Task 3
         return reverse('show_profile', kwargs={'pk': self.object.pk})
     
     
-class FollowProfileView(LoginRequiredMixin, View):
+def wants_json(request):
+    '''Return True if the request was made from JavaScript and expects a JSON reply.'''
+    return (request.headers.get('x-requested-with') == 'XMLHttpRequest'
+            or 'application/json' in request.headers.get('accept', ''))
+
+
+def follow_response(request, profile, following):
+    '''Return the JSON follow state for AJAX callers, or redirect back to the profile page.'''
+    if wants_json(request):
+        count = Profile.objects.values_list('follower_count', flat=True).get(pk=profile.pk)
+        return JsonResponse({'following': following, 'count': count})
+    return redirect('show_profile', pk=profile.pk)
+
+
+def like_response(request, post, liked):
+    '''Return the JSON like state for AJAX callers, or redirect back to the post page.'''
+    if wants_json(request):
+        count = Post.objects.values_list('like_count', flat=True).get(pk=post.pk)
+        return JsonResponse({'liked': liked, 'count': count})
+    return redirect('show_post', pk=post.pk)
+
+
+class FollowProfileView(LoggedInProfileMixin, View):
     '''View to follow another profile.'''
     
     def get_login_url(self):
         '''Return the URL required for login.'''
         return reverse('login')
     
-    def dispatch(self, request, *args, **kwargs):
-        '''Handle the follow action.'''
+    def post(self, request, *args, **kwargs):
+        '''Handle the follow action (repeating it does nothing).'''
         
         # Get the profile to follow (from URL pk parameter)
-        profile_to_follow = Profile.objects.get(pk=self.kwargs['pk'])
+        profile_to_follow = get_object_or_404(Profile, pk=self.kwargs['pk'])
         
         # Get the logged-in user's profile
-        follower_profile = Profile.objects.get(user=self.request.user)
+        follower_profile = self.get_logged_in_profile()
         
-        # Check if not already following (prevent duplicates)
-        if not Follow.objects.filter(profile=profile_to_follow, follower_profile=follower_profile).exists():
-            # Create the Follow relationship
-            follow = Follow()
-            follow.profile = profile_to_follow
-            follow.follower_profile = follower_profile
-            follow.save()
+        # Create the Follow unless it exists; the unique constraint stops
+        # a double click from adding a second one
+        _, created = Follow.objects.get_or_create(profile=profile_to_follow, follower_profile=follower_profile)
+        if created:
+            # Add the followed profile's recent posts to the follower's feed
+            backfill_timeline(follower_profile, profile_to_follow)
         
-        # Redirect back to the profile page
-        return redirect('show_profile', pk=profile_to_follow.pk)
+        return follow_response(request, profile_to_follow, following=True)
 
 
-class UnfollowProfileView(LoginRequiredMixin, View):
+class UnfollowProfileView(LoggedInProfileMixin, View):
     '''View to unfollow a profile.'''
     
     def get_login_url(self):
         '''Return the URL required for login.'''
         return reverse('login')
     
-    def dispatch(self, request, *args, **kwargs):
-        '''Handle the unfollow action.'''
+    def post(self, request, *args, **kwargs):
+        '''Handle the unfollow action (repeating it does nothing).'''
         
         # Get the profile to unfollow (from URL pk parameter)
-        profile_to_unfollow = Profile.objects.get(pk=self.kwargs['pk'])
+        profile_to_unfollow = get_object_or_404(Profile, pk=self.kwargs['pk'])
         
         # Get the logged-in user's profile
-        follower_profile = Profile.objects.get(user=self.request.user)
+        follower_profile = self.get_logged_in_profile()
         
         # Find and delete the Follow relationship
-        Follow.objects.filter(
+        deleted, _ = Follow.objects.filter(
             profile=profile_to_unfollow,
             follower_profile=follower_profile
         ).delete()
         
-        # Redirect back to the profile page
-        return redirect('show_profile', pk=profile_to_unfollow.pk)
+        if deleted:
+            # Remove the unfollowed profile's posts from the follower's feed
+            remove_from_timeline(follower_profile, profile_to_unfollow)
+        
+        return follow_response(request, profile_to_unfollow, following=False)
 
 
 # ============================================
 # LIKE / UNLIKE VIEWS
 # ============================================
 
-class LikePostView(LoginRequiredMixin, View):
+class LikePostView(LoggedInProfileMixin, View):
     '''View to like a post.'''
     
     def get_login_url(self):
         '''Return the URL required for login.'''
         return reverse('login')
     
-    def dispatch(self, request, *args, **kwargs):
-        '''Handle the like action.'''
+    def post(self, request, *args, **kwargs):
+        '''Handle the like action (repeating it does nothing).'''
         
         # Get the post to like (from URL pk parameter)
-        post = Post.objects.get(pk=self.kwargs['pk'])
+        post = get_object_or_404(Post, pk=self.kwargs['pk'])
         
         # Get the logged-in user's profile
-        profile = Profile.objects.get(user=self.request.user)
+        profile = self.get_logged_in_profile()
         
-        # Check if not already liked (prevent duplicates)
-        if not Like.objects.filter(post=post, profile=profile).exists():
-            # Create the Like
-            like = Like()
-            like.post = post
-            like.profile = profile
-            like.save()
+        # Create the Like unless it exists; the unique constraint stops
+        # a double click from adding a second one
+        Like.objects.get_or_create(post=post, profile=profile)
         
-        # Redirect back to the post page
-        return redirect('show_post', pk=post.pk)
+        return like_response(request, post, liked=True)
 
 
-class UnlikePostView(LoginRequiredMixin, View):
+class UnlikePostView(LoggedInProfileMixin, View):
     '''View to unlike a post.'''
     
     def get_login_url(self):
         '''Return the URL required for login.'''
         return reverse('login')
     
-    def dispatch(self, request, *args, **kwargs):
-        '''Handle the unlike action.'''
+    def post(self, request, *args, **kwargs):
+        '''Handle the unlike action (repeating it does nothing).'''
         
         # Get the post to unlike (from URL pk parameter)
-        post = Post.objects.get(pk=self.kwargs['pk'])
+        post = get_object_or_404(Post, pk=self.kwargs['pk'])
         
         # Get the logged-in user's profile
-        profile = Profile.objects.get(user=self.request.user)
+        profile = self.get_logged_in_profile()
         
         # Find and delete the Like
         Like.objects.filter(post=post, profile=profile).delete()
         
-        # Redirect back to the post page
-        return redirect('show_post', pk=post.pk)
-    
-class LoggedInProfileMixin(LoginRequiredMixin):
-    login_url = None  # fallback if get_login_url not overridden
-
-    def get_login_url(self):
-        # central place to point to your app’s login route
-        return reverse('mini_insta_login')
-
-    def get_logged_in_profile(self):
-        return get_object_or_404(Profile, user=self.request.user)
\ No newline at end of file
+        return like_response(request, post, liked=False)
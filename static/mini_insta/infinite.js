@@ -0,0 +1,52 @@
+// file: infinite.js
+// name: Shanika Paul
+// email: shanikap@bu.edu
+// description: Load the next page of a list when its "Load more" link scrolls into view.
+
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('a[data-infinite-next]').forEach(function (link) {
+        const list = link.previousElementSibling;
+        if (!list || !list.hasAttribute('data-infinite-list')) {
+            return;
+        }
+        let loading = false;
+
+        function loadMore() {
+            if (loading || !link.href) {
+                return;
+            }
+            loading = true;
+            fetch(link.href, {
+                headers: {'X-Requested-With': 'XMLHttpRequest', 'Accept': 'application/json'},
+                credentials: 'same-origin',
+            })
+                .then(function (response) {
+                    return response.json();
+                })
+                .then(function (data) {
+                    list.insertAdjacentHTML('beforeend', data.html);
+                    if (data.next) {
+                        link.href = data.next;
+                    } else {
+                        observer.disconnect();
+                        link.remove();
+                    }
+                })
+                .finally(function () {
+                    loading = false;
+                });
+        }
+
+        // without JavaScript (or on click) the link just opens the next page
+        const observer = new IntersectionObserver(function (entries) {
+            if (entries.some(function (entry) { return entry.isIntersecting; })) {
+                loadMore();
+            }
+        });
+        observer.observe(link);
+        link.addEventListener('click', function (event) {
+            event.preventDefault();
+            loadMore();
+        });
+    });
+});
@@ -0,0 +1,45 @@
+// file: toggle.js
+// name: Shanika Paul
+// email: shanikap@bu.edu
+// description: Submit like/unlike and follow/unfollow forms in the background and update the page in place.
+
+document.addEventListener('submit', function (event) {
+    const form = event.target.closest('form[data-toggle]');
+    if (!form) {
+        return;
+    }
+    event.preventDefault();
+
+    const group = form.closest('[data-toggle-group]');
+    const button = form.querySelector('button');
+    button.disabled = true;
+
+    fetch(form.action, {
+        method: 'POST',
+        body: new FormData(form),
+        headers: {'X-Requested-With': 'XMLHttpRequest', 'Accept': 'application/json'},
+        credentials: 'same-origin',
+    })
+        .then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.json();
+        })
+        .then(function (data) {
+            // show the opposite form, and the new count
+            group.querySelectorAll('form[data-toggle]').forEach(function (other) {
+                other.hidden = other === form;
+            });
+            document.querySelectorAll(group.dataset.countTarget).forEach(function (element) {
+                element.textContent = data.count;
+            });
+        })
+        .catch(function () {
+            // fall back to a normal form submission
+            form.submit();
+        })
+        .finally(function () {
+            button.disabled = false;
+        });
+});
@@ -0,0 +1,59 @@
+# file: aggregates.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Database-side aggregate queries behind the voter_analytics graphs.
+
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractYear
+
+from .models import ELECTIONS, ELECTION_FIELDS
+
+
+def birth_year_counts(voters):
+    '''Return a list of (year, count) pairs for a Voter queryset, ordered by year.'''
+    rows = (voters.annotate(year=ExtractYear('date_of_birth'))
+                  .values('year')
+                  .annotate(count=Count('pk'))
+                  .order_by('year'))
+    return [(row['year'], row['count']) for row in rows]
+
+
+def party_counts(voters):
+    '''Return a list of (party_affiliation, count) pairs for a Voter queryset.'''
+    rows = (voters.values('party_affiliation')
+                  .annotate(count=Count('pk'))
+                  .order_by('party_affiliation'))
+    return [(row['party_affiliation'], row['count']) for row in rows]
+
+
+def election_counts(voters):
+    '''Return a dict of election field -> number of voters who voted in it.
+
+    All elections are counted in a single query using conditional aggregates.
+    '''
+    return voters.aggregate(**{
+        field: Count('pk', filter=Q(**{field: True})) for field in ELECTION_FIELDS
+    })
+
+
+def graph_data(voters):
+    '''Return the data behind the three graphs as a JSON-serializable dict.'''
+    year_counts = birth_year_counts(voters)
+    party_totals = party_counts(voters)
+    elections = election_counts(voters)
+
+    return {
+        'birth_years': {
+            'years': [year for year, count in year_counts],
+            'counts': [count for year, count in year_counts],
+        },
+        'parties': {
+            'labels': [party for party, count in party_totals],
+            'counts': [count for party, count in party_totals],
+        },
+        'elections': {
+            'labels': [label for field, label in ELECTIONS],
+            'counts': [elections[field] for field, label in ELECTIONS],
+        },
+    }
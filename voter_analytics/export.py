@@ -0,0 +1,126 @@
+# file: export.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Streaming CSV and Parquet writers for exporting filtered voter lists.
+
+import csv
+from importlib.util import find_spec
+from itertools import islice
+
+from .models import ELECTION_FIELDS
+
+
+# Columns written to the export files, in order
+EXPORT_FIELDS = [
+    'voter_id',
+    'last_name',
+    'first_name',
+    'street_number',
+    'street_name',
+    'apartment_number',
+    'zip_code',
+    'date_of_birth',
+    'date_of_registration',
+    'party_affiliation',
+    'precinct_number',
+    *ELECTION_FIELDS,
+    'voter_score',
+]
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def export_rows(voters, chunk_size=DEFAULT_CHUNK_SIZE):
+    '''Return an iterator over tuples of EXPORT_FIELDS values.
+
+    The rows are read from the database in chunks with a server-side cursor
+    (where supported), so no Voter instances are built and memory stays flat.
+    '''
+    return voters.order_by('pk').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def batched(rows, size):
+    '''Yield lists of at most size items from rows.'''
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Echo:
+    '''A file-like object that returns what is written to it, for csv.writer.'''
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    '''Yield the export as CSV text, one string per chunk of rows.'''
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for batch in batched(rows, chunk_size):
+        yield ''.join(writer.writerow(row) for row in batch)
+
+
+class StreamSink:
+    '''A write-only file that keeps what was written until it is drained.'''
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.buffer += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        '''Return and forget everything written since the last drain.'''
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def parquet_available():
+    '''Return True if pyarrow (needed for Parquet export) is installed.'''
+    return find_spec('pyarrow') is not None
+
+
+def parquet_chunks(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    '''Yield the export as a Parquet file, one row group per chunk of rows.
+
+    Requires pyarrow (raises ImportError if it is not installed).
+    '''
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {
+        'street_number': pa.int64(),
+        'voter_score': pa.int64(),
+        'date_of_birth': pa.date32(),
+        'date_of_registration': pa.date32(),
+        **{field: pa.bool_() for field in ELECTION_FIELDS},
+    }
+    schema = pa.schema([(field, types.get(field, pa.string())) for field in EXPORT_FIELDS])
+
+    sink = StreamSink()
+    writer = pq.ParquetWriter(sink, schema)
+    for batch in batched(rows, chunk_size):
+        columns = [pa.array(column, type=schema.field(i).type) for i, column in enumerate(zip(*batch))]
+        writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
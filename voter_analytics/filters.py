@@ -0,0 +1,135 @@
+# file: filters.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: VoterFilter, the shared filter used by the voter list, graphs and exports.
+
+import hashlib
+from datetime import date, MINYEAR, MAXYEAR
+
+from django.utils.http import urlencode
+
+from .models import Voter, VoterDataVersion, ELECTION_FIELDS
+
+
+def _to_int(value):
+    '''Return value as an int, or None if it is missing or not a number.'''
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_year(value):
+    '''Return value as a valid year, or None.'''
+    year = _to_int(value)
+    return year if year is not None and MINYEAR <= year <= MAXYEAR else None
+
+
+class VoterFilter:
+    '''The filters chosen on voter_analytics/filter_form.html.
+
+    The GET parameters are normalized once, so two requests asking for the
+    same voters (in any parameter order, with empty or unknown values) get
+    the same key. The key can be used to cache results per filter set.
+    '''
+
+    def __init__(self, params):
+        '''Read the filter values from a QueryDict (usually request.GET).'''
+        # party codes are padded to two characters, e.g. 'D ', so don't strip them
+        self.party_affiliation = params.get('party_affiliation') or None
+        self.min_birth_year = _to_year(params.get('min_birth_year'))
+        self.max_birth_year = _to_year(params.get('max_birth_year'))
+        self.voter_score = _to_int(params.get('voter_score'))
+
+        # elections the voter must have voted in (checkboxes)
+        self.elections = tuple(field for field in ELECTION_FIELDS if field in params)
+
+        self._queryset = None
+        self._data_version = None
+
+    @property
+    def key(self):
+        '''A canonical, hashable representation of this filter set.'''
+        return (
+            self.party_affiliation,
+            self.min_birth_year,
+            self.max_birth_year,
+            self.voter_score,
+            self.elections,
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, VoterFilter) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    @property
+    def data_version(self):
+        '''The Voter table's data version (looked up once per VoterFilter).'''
+        if self._data_version is None:
+            self._data_version = VoterDataVersion.current().version
+        return self._data_version
+
+    def cache_key(self, namespace):
+        '''Return a cache key for storing a result computed for this filter set.
+
+        The key includes the data version, so results cached before the last
+        import of the voter file are never used again.
+        '''
+        digest = hashlib.md5(repr(self.key).encode()).hexdigest()
+        return f'voter_analytics:{namespace}:{self.data_version}:{digest}'
+
+    def is_empty(self):
+        '''Return True if no filters are applied.'''
+        return self.key == (None, None, None, None, ())
+
+    def apply(self, qs):
+        '''Return qs with the filters applied.'''
+        # Filter by party affiliation
+        if self.party_affiliation:
+            qs = qs.filter(party_affiliation=self.party_affiliation)
+
+        # Filter by minimum and maximum birth year, as date ranges so the
+        # date_of_birth indexes can be used (a __year lookup wraps the column)
+        if self.min_birth_year is not None:
+            qs = qs.filter(date_of_birth__gte=date(self.min_birth_year, 1, 1))
+        if self.max_birth_year is not None:
+            qs = qs.filter(date_of_birth__lte=date(self.max_birth_year, 12, 31))
+
+        # Filter by voter score
+        if self.voter_score is not None:
+            qs = qs.filter(voter_score=self.voter_score)
+
+        # Filter by elections voted in
+        for field in self.elections:
+            qs = qs.filter(**{field: True})
+
+        return qs
+
+    @property
+    def queryset(self):
+        '''The filtered Voter queryset (built once per VoterFilter).'''
+        if self._queryset is None:
+            self._queryset = self.apply(Voter.objects.all())
+        return self._queryset
+
+    def as_params(self):
+        '''Return the filters as a list of GET parameters.'''
+        params = []
+        if self.party_affiliation:
+            params.append(('party_affiliation', self.party_affiliation))
+        if self.min_birth_year is not None:
+            params.append(('min_birth_year', self.min_birth_year))
+        if self.max_birth_year is not None:
+            params.append(('max_birth_year', self.max_birth_year))
+        if self.voter_score is not None:
+            params.append(('voter_score', self.voter_score))
+        for field in self.elections:
+            params.append((field, 'True'))
+        return params
+
+    def querystring(self):
+        '''Return the filters as a URL query string (without the leading '?').'''
+        return urlencode(self.as_params())
@@ -0,0 +1,304 @@
+# file: importer.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Streaming CSV importer that loads the Newton voter file into the Voter table in batches.
+
+import csv
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Voter, VoterImport, VoterDataVersion, ELECTION_FIELDS
+from .rollup import rebuild_rollup, rollup_suspended
+
+
+# Column layout of data/newton_voters.csv (index 0 is the Voter ID Number)
+CSV_FIELDS = [
+    'last_name',
+    'first_name',
+    'street_number',
+    'street_name',
+    'apartment_number',
+    'zip_code',
+    'date_of_birth',
+    'date_of_registration',
+    'party_affiliation',
+    'precinct_number',
+    'v20state',
+    'v21town',
+    'v21primary',
+    'v22general',
+    'v23town',
+    'voter_score',
+]
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def parse_row(fields):
+    '''Convert one CSV record into a dict of Voter field values.
+
+    Raises ValueError if the record is malformed.
+    '''
+    if len(fields) < len(CSV_FIELDS) + 1:
+        raise ValueError(f'expected {len(CSV_FIELDS) + 1} columns, got {len(fields)}')
+
+    voter_id = fields[0].strip()
+    if not voter_id:
+        raise ValueError('missing Voter ID Number')
+
+    values = {'voter_id': voter_id}
+    for name, raw in zip(CSV_FIELDS, fields[1:]):
+        raw = raw.strip()
+        if name in ELECTION_FIELDS:
+            # Convert TRUE/FALSE strings to boolean
+            values[name] = raw.upper() == 'TRUE'
+        elif name == 'apartment_number':
+            # Handle empty apartment numbers
+            values[name] = raw or None
+        else:
+            # Let the model field validate and convert the value (ints, dates)
+            try:
+                values[name] = Voter._meta.get_field(name).to_python(raw)
+            except ValidationError as e:
+                raise ValueError(f'{name}: {"; ".join(e.messages)}')
+
+    # the party codes are stored padded to two characters, e.g. 'D '
+    values['party_affiliation'] = values['party_affiliation'].ljust(2)
+    return values
+
+
+class VoterImporter:
+    '''Load a voter CSV file into the database in fixed-size batches.
+
+    The file is streamed through the csv module, so memory use depends on
+    chunk_size and not on the size of the file. Each chunk is written inside
+    its own transaction. Rows that cannot be parsed are written to
+    reject_path (with the error) instead of being printed.
+
+    By default the import reconciles the table with the file, matching rows
+    on the Voter ID Number: new voters are inserted, changed voters are
+    updated, and voters missing from the file are deleted (found through
+    the last_import stamp on each row, not a set of every id read). With
+    replace=True the table is emptied first and every row is inserted.
+    '''
+
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE, reject_path=None, progress=None, replace=False):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.reject_path = reject_path or f'{path}.rejects.csv'
+        self.progress = progress  # optional callable(importer)
+        self.replace = replace
+
+        self.rows_read = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.rejected = 0
+        self.started = None
+
+        # set if a rejected row had no Voter ID Number, so missing voters
+        # cannot safely be told apart from unreadable ones
+        self.rejected_without_id = False
+
+        # Voter IDs of rejected rows not yet stamped (see keep_rejected)
+        self.rejected_ids = []
+
+        # precincts whose voters changed, so their PrecinctRollup rows need rebuilding
+        self.dirty_precincts = set()
+
+        # the VoterImport being written; every voter seen in the file is
+        # stamped with its pk (Voter.last_import), so voters missing from the
+        # file are found in the database rather than in a set of every id
+        self.record = None
+        self.rejects = None
+
+    @property
+    def stamp(self):
+        '''The Voter.last_import value for the voters this import has seen.'''
+        return self.record.pk
+
+    @property
+    def elapsed(self):
+        '''Seconds since the import started.'''
+        return time.monotonic() - self.started if self.started else 0.0
+
+    @property
+    def rows_per_second(self):
+        '''Average throughput of the import so far.'''
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+    def reject(self, fields, error):
+        '''Write a row that cannot be loaded to the rejects file.'''
+        self.rejected += 1
+        self.rejects.writerow(fields + [error])
+
+    def read_chunks(self, reader):
+        '''Yield lists of (fields, parsed row) pairs, at most chunk_size long.'''
+        chunk = []
+        for fields in reader:
+            if not fields:
+                continue
+            self.rows_read += 1
+            try:
+                chunk.append((fields, parse_row(fields)))
+            except ValueError as e:
+                self.reject(fields, str(e))
+                if fields[0].strip():
+                    self.rejected_ids.append(fields[0].strip())
+                    if len(self.rejected_ids) >= self.chunk_size:
+                        self.keep_rejected()
+                else:
+                    self.rejected_without_id = True
+                continue
+
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+        self.keep_rejected()
+
+    def keep_rejected(self):
+        '''Mark the existing voters whose rows were rejected, so they are not deleted as missing.
+
+        They get the negative stamp, so a valid row for the same voter later
+        in the file is still loaded rather than taken for a duplicate.
+        '''
+        if self.rejected_ids:
+            (Voter.objects.filter(voter_id__in=self.rejected_ids)
+                          .exclude(last_import=self.stamp)
+                          .update(last_import=-self.stamp))
+            self.rejected_ids = []
+
+    def sync_chunk(self, chunk):
+        '''Insert the new voters and update the changed voters in one chunk.
+
+        A voter already stamped by this import was earlier in the file, so
+        its row is rejected as a duplicate.
+        '''
+        existing = Voter.objects.in_bulk([values['voter_id'] for fields, values in chunk], field_name='voter_id')
+
+        new = []
+        changed = []
+        unchanged = []
+        in_chunk = set()
+        for fields, values in chunk:
+            voter = existing.get(values['voter_id'])
+            if values['voter_id'] in in_chunk or (voter is not None and voter.last_import == self.stamp):
+                self.reject(fields, f'duplicate Voter ID Number {values["voter_id"]}')
+                continue
+            in_chunk.add(values['voter_id'])
+
+            if voter is None:
+                new.append(Voter(**values, last_import=self.stamp))
+                self.dirty_precincts.add(values['precinct_number'])
+            elif any(getattr(voter, name) != value for name, value in values.items()):
+                # both the old and the new precinct's rollups change
+                self.dirty_precincts.add(voter.precinct_number)
+                self.dirty_precincts.add(values['precinct_number'])
+                for name, value in values.items():
+                    setattr(voter, name, value)
+                voter.last_import = self.stamp
+                changed.append(voter)
+            else:
+                unchanged.append(voter.pk)
+
+        with transaction.atomic():
+            Voter.objects.bulk_create(new, batch_size=self.chunk_size)
+            Voter.objects.bulk_update(changed, CSV_FIELDS + ['last_import'], batch_size=self.chunk_size)
+            Voter.objects.filter(pk__in=unchanged).update(last_import=self.stamp)
+
+        self.inserted += len(new)
+        self.updated += len(changed)
+        self.unchanged += len(unchanged)
+
+    def delete_missing(self):
+        '''Delete the voters whose Voter ID Number was not in the file.
+
+        These are the voters this import did not stamp; voters whose row was
+        in the file but rejected were marked by keep_rejected and are kept.
+        '''
+        missing = Voter.objects.exclude(last_import__in=[self.stamp, -self.stamp])
+        while rows := list(missing.values_list('pk', 'precinct_number')[:self.chunk_size]):
+            self.dirty_precincts.update(precinct_number for pk, precinct_number in rows)
+            self.delete_ids([pk for pk, precinct_number in rows])
+
+    def delete_ids(self, pks):
+        '''Delete the voters with the given primary keys, chunk_size at a time.
+
+        Voter has delete signal receivers, so Django loads each deleted row;
+        deleting in chunks keeps that from loading the whole table at once.
+        '''
+        for start in range(0, len(pks), self.chunk_size):
+            with transaction.atomic():
+                self.deleted += Voter.objects.filter(pk__in=pks[start:start + self.chunk_size]).delete()[0]
+
+    def delete_all(self):
+        '''Delete every voter, chunk_size at a time (see delete_ids).'''
+        while pks := list(Voter.objects.values_list('pk', flat=True)[:self.chunk_size]):
+            self.delete_ids(pks)
+
+    def run(self):
+        '''Load the file, either reconciling with or replacing the Voter table.
+
+        A replace runs in one transaction, so the old voters are only swapped
+        out once the whole file has loaded; if the file is missing, unreadable
+        or has no valid rows, the table is left as it was. The rollup is
+        rebuilt once at the end, not by the Voter signal handlers.
+        '''
+        with rollup_suspended():
+            if self.replace:
+                with transaction.atomic():
+                    return self.load()
+            return self.load()
+
+    def load(self):
+        '''Do the work of run().'''
+        self.started = time.monotonic()
+
+        with open(self.path, newline='') as f, open(self.reject_path, 'w', newline='') as r:
+            reader = csv.reader(f)
+            next(reader, None)  # Discard headers
+            self.rejects = csv.writer(r)
+            self.record = VoterImport.objects.create(path=self.path)
+
+            if self.replace:
+                # Delete existing records to prevent duplicates (undone if the load fails)
+                self.delete_all()
+
+            for chunk in self.read_chunks(reader):
+                self.sync_chunk(chunk)
+                if self.progress:
+                    self.progress(self)
+
+        loaded = self.inserted + self.updated + self.unchanged
+        if self.replace and not loaded:
+            raise ValueError(f'{self.path} has no valid rows; the voters were not replaced')
+
+        # Never retire the whole roll because of an empty or unreadable file,
+        # or retire voters whose rows could not be matched to an id
+        if not self.replace and loaded and not self.rejected_without_id:
+            self.delete_missing()
+
+        # Bring the precomputed precinct rollup up to date
+        if self.replace:
+            rebuild_rollup()
+        elif self.dirty_precincts:
+            rebuild_rollup(self.dirty_precincts)
+
+        # A new data version invalidates cached results
+        if self.inserted or self.updated or self.deleted:
+            VoterDataVersion.bump()
+
+        self.record.inserted = self.inserted
+        self.record.updated = self.updated
+        self.record.deleted = self.deleted
+        self.record.rejected = self.rejected
+        self.record.finished_at = timezone.now()
+        self.record.save()
+        return self
@@ -0,0 +1,63 @@
+# file: import_voters.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Management command to bulk load the Newton voter CSV file into the Voter table.
+
+from django.core.management.base import BaseCommand, CommandError
+
+from voter_analytics.importer import VoterImporter, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    '''Stream a voter CSV file into the database in batches.'''
+
+    help = ('Load voter records from a CSV file. By default the Voter table is reconciled with the '
+            'file by Voter ID Number; use --replace to delete everything and reload.')
+
+    def add_arguments(self, parser):
+        '''Define the command line arguments.'''
+        parser.add_argument('path', nargs='?', default='data/newton_voters.csv',
+                            help='CSV file to load (default: data/newton_voters.csv)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help='number of rows written per transaction')
+        parser.add_argument('--rejects', default=None,
+                            help='file for rows that could not be parsed (default: <path>.rejects.csv)')
+        parser.add_argument('--replace', action='store_true',
+                            help='delete all voters first instead of reconciling with the file')
+
+    def report_progress(self, importer):
+        '''Print the running totals after each chunk.'''
+        self.stdout.write(
+            f'\r{importer.rows_read} rows read, {importer.rejected} rejected '
+            f'({importer.rows_per_second:,.0f} rows/sec)',
+            ending='',
+        )
+        self.stdout.flush()
+
+    def handle(self, *args, **options):
+        '''Run the import and print a summary.'''
+        importer = VoterImporter(
+            options['path'],
+            chunk_size=options['chunk_size'],
+            reject_path=options['rejects'],
+            progress=self.report_progress if options['verbosity'] > 0 else None,
+            replace=options['replace'],
+        )
+        try:
+            importer.run()
+        except (OSError, ValueError) as e:
+            # a failed --replace is rolled back; a reconcile keeps the chunks already written
+            unchanged = ' The Voter table was not changed.' if options['replace'] else ''
+            raise CommandError(f'Import failed: {e}.{unchanged}')
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'Done in {importer.elapsed:.1f}s ({importer.rows_per_second:,.0f} rows/sec): '
+            f'{importer.inserted} inserted, {importer.updated} updated, '
+            f'{importer.unchanged} unchanged, {importer.deleted} deleted.'
+        ))
+        if importer.rejected:
+            self.stdout.write(self.style.WARNING(
+                f'{importer.rejected} rows rejected, see {importer.reject_path}'
+            ))
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:13
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractYear
+
+
+ELECTION_FIELDS = ['v20state', 'v21town', 'v21primary', 'v22general', 'v23town']
+
+
+def build_rollup(apps, schema_editor):
+    '''Fill the rollup table from the voters already loaded.'''
+    Voter = apps.get_model('voter_analytics', 'Voter')
+    PrecinctRollup = apps.get_model('voter_analytics', 'PrecinctRollup')
+
+    rows = (Voter.objects.annotate(birth_year=ExtractYear('date_of_birth'))
+                         .values('precinct_number', 'party_affiliation', 'birth_year', 'voter_score')
+                         .annotate(voter_count=Count('pk'),
+                                   **{field: Count('pk', filter=Q(**{field: True})) for field in ELECTION_FIELDS})
+                         .order_by())
+    PrecinctRollup.objects.bulk_create((PrecinctRollup(**row) for row in rows), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voter_analytics', '0005_voterimport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrecinctRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('precinct_number', models.CharField(max_length=10)),
+                ('party_affiliation', models.CharField(max_length=2)),
+                ('birth_year', models.IntegerField()),
+                ('voter_score', models.IntegerField()),
+                ('voter_count', models.IntegerField(default=0)),
+                ('v20state', models.IntegerField(default=0)),
+                ('v21town', models.IntegerField(default=0)),
+                ('v21primary', models.IntegerField(default=0)),
+                ('v22general', models.IntegerField(default=0)),
+                ('v23town', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('precinct_number', 'party_affiliation', 'birth_year', 'voter_score'), name='precinct_rollup_unique_group')],
+            },
+        ),
+        migrations.RunPython(build_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voter_analytics', '0006_precinctrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voter',
+            name='last_import',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:04
+
+from django.db import migrations, models
+
+
+def seed_version(apps, schema_editor):
+    '''Start from the last import that changed voters, and drop the per-edit import rows.'''
+    VoterImport = apps.get_model('voter_analytics', 'VoterImport')
+    VoterDataVersion = apps.get_model('voter_analytics', 'VoterDataVersion')
+    VoterImport.objects.filter(path__endswith=' (direct edit)').delete()
+    latest = (VoterImport.objects.exclude(inserted=0, updated=0, deleted=0)
+                                 .order_by('-pk')
+                                 .first())
+    if latest is not None:
+        VoterDataVersion.objects.create(pk=1, version=latest.pk, changed_at=latest.finished_at)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voter_analytics', '0007_voter_last_import'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoterDataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.IntegerField(default=0)),
+                ('changed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(seed_version, migrations.RunPython.noop),
+    ]
@@ -5,10 +5,24 @@
 # description: Data models for voter_analytics application including Voter model and load_data function.
 
 from django.db import models
+from django.utils import timezone
+
+# Elections tracked on each Voter, with the labels used in the graphs
+ELECTIONS = [
+    ('v20state', '2020 State'),
+    ('v21town', '2021 Town'),
+    ('v21primary', '2021 Primary'),
+    ('v22general', '2022 General'),
+    ('v23town', '2023 Town'),
+]
+ELECTION_FIELDS = [field for field, label in ELECTIONS]
 
 class Voter(models.Model):
     '''Represent a registered voter in Newton, MA.'''
     
+    # Voter ID Number from the town's voter file (used to match records on reload)
+    voter_id = models.CharField(max_length=20, unique=True, blank=True, null=True)
+    
     # Personal information
     first_name = models.TextField()
     last_name = models.TextField()
@@ -35,57 +49,120 @@ class Voter(models.Model):
     # Voter score
     voter_score = models.IntegerField()
     
+    # pk of the VoterImport that last found this voter in the file (negated
+    # if the voter's row was rejected); used to find voters missing from a reload
+    last_import = models.IntegerField(blank=True, null=True)
+    
+    class Meta:
+        # Indexes for the access paths of voter_analytics/filter_form.html
+        indexes = [
+            models.Index(fields=['party_affiliation', 'voter_score', 'date_of_birth'], name='voter_party_score_dob_idx'),
+            models.Index(fields=['voter_score', 'date_of_birth'], name='voter_score_dob_idx'),
+            models.Index(fields=['date_of_birth'], name='voter_dob_idx'),
+            models.Index(fields=['precinct_number'], name='voter_precinct_idx'),
+            # ordering of the voter list, used for keyset pagination
+            models.Index(fields=['last_name', 'first_name', 'id'], name='voter_name_idx'),
+        ]
+    
     def __str__(self):
         '''Return a string representation of this voter.'''
         return f'{self.first_name} {self.last_name} - {self.street_number} {self.street_name}, Precinct {self.precinct_number}'
+
+
+class PrecinctRollup(models.Model):
+    '''Precomputed voter counts for one (precinct, party, birth year, voter score) group.
+
+    Maintained by voter_analytics.rollup whenever the voter file is imported
+    (and by voter_analytics.signals when voters are edited directly), so aggregate pages can read thousands of rollup rows instead of every Voter.
+    '''
     
+    precinct_number = models.CharField(max_length=10)
+    party_affiliation = models.CharField(max_length=2)
+    birth_year = models.IntegerField()
+    voter_score = models.IntegerField()
+    
+    # number of voters in the group, and how many of them voted in each election
+    voter_count = models.IntegerField(default=0)
+    v20state = models.IntegerField(default=0)
+    v21town = models.IntegerField(default=0)
+    v21primary = models.IntegerField(default=0)
+    v22general = models.IntegerField(default=0)
+    v23town = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['precinct_number', 'party_affiliation', 'birth_year', 'voter_score'],
+                name='precinct_rollup_unique_group',
+            ),
+        ]
     
+    def __str__(self):
+        '''Return a string representation of this rollup group.'''
+        return (f'Precinct {self.precinct_number}, {self.party_affiliation}, born {self.birth_year}, '
+                f'score {self.voter_score}: {self.voter_count} voters')
+
+
+class VoterImport(models.Model):
+    '''Record of one load of the voter file into the Voter table.'''
     
+    path = models.TextField()
+    finished_at = models.DateTimeField(auto_now_add=True)
+    inserted = models.IntegerField(default=0)
+    updated = models.IntegerField(default=0)
+    deleted = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
     
+    def __str__(self):
+        '''Return a string representation of this import.'''
+        return f'{self.path} at {self.finished_at}: +{self.inserted} ~{self.updated} -{self.deleted}'
+    
+    @classmethod
+    def latest_change(cls):
+        '''Return the most recent import that changed the Voter table, or None.'''
+        return (cls.objects.exclude(inserted=0, updated=0, deleted=0)
+                           .order_by('-pk')
+                           .first())
+
+
+class VoterDataVersion(models.Model):
+    '''A single row stamping the current state of the Voter table.
+
+    Bumped by every import that changes voters and by each transaction that
+    edits voters directly (see voter_analytics.signals). Cached results
+    (counts, charts) include the version in their keys, so they are
+    invalidated by the next change to any voter.
+    '''
+    
+    version = models.IntegerField(default=0)
+    changed_at = models.DateTimeField(blank=True, null=True)
+    
+    def __str__(self):
+        '''Return a string representation of this data version.'''
+        return f'Voter data version {self.version} ({self.changed_at})'
+    
+    @classmethod
+    def current(cls):
+        '''Return the VoterDataVersion row (unsaved, version 0, if nothing has changed yet).'''
+        return cls.objects.filter(pk=1).first() or cls(pk=1)
+    
+    @classmethod
+    def bump(cls):
+        '''Record that the Voter table has changed.'''
+        now = timezone.now()
+        if not cls.objects.filter(pk=1).update(version=models.F('version') + 1, changed_at=now):
+            cls.objects.get_or_create(pk=1, defaults={'version': 1, 'changed_at': now})
+
+
 def load_data():
     '''Function to load data records from CSV file into Django model instances.'''
     
-    # Delete existing records to prevent duplicates
-    Voter.objects.all().delete()
-    
-    filename = 'data/newton_voters.csv'
-    f = open(filename)
-    f.readline()  # Discard headers
-    
-    for line in f:
-        line = line.strip()
-        fields = line.split(',')
-        
-        try:
-            # Create a new instance of Voter object with this record from CSV
-            voter = Voter(
-                # fields[0] is Voter ID Number - we skip it
-                last_name = fields[1],
-                first_name = fields[2],
-                street_number = fields[3],
-                street_name = fields[4],
-                apartment_number = fields[5] if fields[5] else None,  # Handle empty apartment numbers
-                zip_code = fields[6],
-                date_of_birth = fields[7],
-                date_of_registration = fields[8],
-                party_affiliation = fields[9],  
-                precinct_number = fields[10],
-                
-                # Convert TRUE/FALSE strings to boolean
-                v20state = fields[11].upper() == 'TRUE',
-                v21town = fields[12].upper() == 'TRUE',
-                v21primary = fields[13].upper() == 'TRUE',
-                v22general = fields[14].upper() == 'TRUE',
-                v23town = fields[15].upper() == 'TRUE',
-                
-                voter_score = fields[16],
-            )
-            
-            voter.save()  # Commit to database
-            print(f'Created voter: {voter}')
-            
-        except Exception as e:
-            print(f"Skipped: {fields}")
-            print(f"Error: {e}")
-    
-    print(f'Done. Created {len(Voter.objects.all())} Voters.')
\ No newline at end of file
+    # imported here to avoid a circular import (the importer uses Voter)
+    from .importer import VoterImporter
+    
+    # Reconcile with the file by Voter ID Number instead of deleting everything
+    importer = VoterImporter('data/newton_voters.csv').run()
+    
+    print(f'Done. Inserted {importer.inserted}, updated {importer.updated}, '
+          f'deleted {importer.deleted} Voters, rejected {importer.rejected} '
+          f'(see {importer.reject_path}).')
@@ -0,0 +1,106 @@
+# file: rollup.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Maintenance of the PrecinctRollup table and graph aggregates read from it.
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractYear
+
+from .models import Voter, PrecinctRollup, ELECTIONS, ELECTION_FIELDS
+
+
+ROLLUP_GROUP = ['precinct_number', 'party_affiliation', 'birth_year', 'voter_score']
+
+# True while a bulk operation (an import) keeps the rollup up to date itself
+_suspended = ContextVar('rollup_suspended', default=False)
+
+
+@contextmanager
+def rollup_suspended():
+    '''Stop the Voter signal handlers from maintaining the rollup inside the block.'''
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def is_rollup_suspended():
+    return _suspended.get()
+
+
+def rollup_rows(voters):
+    '''Return the rollup groups for a Voter queryset as a values() queryset.'''
+    return (voters.annotate(birth_year=ExtractYear('date_of_birth'))
+                  .values(*ROLLUP_GROUP)
+                  .annotate(voter_count=Count('pk'),
+                            **{field: Count('pk', filter=Q(**{field: True})) for field in ELECTION_FIELDS})
+                  .order_by())
+
+
+def rebuild_rollup(precincts=None):
+    '''Recompute the rollup rows for the given precinct numbers (all precincts if None).'''
+    voters = Voter.objects.all()
+    rollups = PrecinctRollup.objects.all()
+    if precincts is not None:
+        voters = voters.filter(precinct_number__in=precincts)
+        rollups = rollups.filter(precinct_number__in=precincts)
+
+    with transaction.atomic():
+        rollups.delete()
+        PrecinctRollup.objects.bulk_create(
+            (PrecinctRollup(**row) for row in rollup_rows(voters)),
+            batch_size=1000,
+        )
+
+
+def can_use_rollup(voter_filter):
+    '''Return True if the rollup table can answer queries for voter_filter.
+
+    The rollup keeps one count per election, so it cannot tell how many
+    voters voted in a particular combination of elections.
+    '''
+    return not voter_filter.elections
+
+
+def filter_rollup(voter_filter):
+    '''Return the rollup rows matching voter_filter (see can_use_rollup).'''
+    rollups = PrecinctRollup.objects.all()
+    if voter_filter.party_affiliation:
+        rollups = rollups.filter(party_affiliation=voter_filter.party_affiliation)
+    if voter_filter.min_birth_year is not None:
+        rollups = rollups.filter(birth_year__gte=voter_filter.min_birth_year)
+    if voter_filter.max_birth_year is not None:
+        rollups = rollups.filter(birth_year__lte=voter_filter.max_birth_year)
+    if voter_filter.voter_score is not None:
+        rollups = rollups.filter(voter_score=voter_filter.voter_score)
+    return rollups
+
+
+def rollup_graph_data(voter_filter):
+    '''Return the same dict as aggregates.graph_data, computed from the rollup table.'''
+    rollups = filter_rollup(voter_filter)
+
+    years = rollups.values('birth_year').annotate(count=Sum('voter_count')).order_by('birth_year')
+    parties = rollups.values('party_affiliation').annotate(count=Sum('voter_count')).order_by('party_affiliation')
+    elections = rollups.aggregate(**{field: Sum(field) for field in ELECTION_FIELDS})
+
+    return {
+        'birth_years': {
+            'years': [row['birth_year'] for row in years],
+            'counts': [row['count'] for row in years],
+        },
+        'parties': {
+            'labels': [row['party_affiliation'] for row in parties],
+            'counts': [row['count'] for row in parties],
+        },
+        'elections': {
+            'labels': [label for field, label in ELECTIONS],
+            'counts': [elections[field] or 0 for field, label in ELECTIONS],
+        },
+    }
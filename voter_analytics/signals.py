@@ -0,0 +1,69 @@
+# file: signals.py
+# name: Shanika Paul
+# email: shanikap@bu.edu
+# date: October 18, 2026
+# description: Keep the precinct rollup and data version current when voters are edited outside an import.
+
+import threading
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Voter, VoterDataVersion
+from .rollup import rebuild_rollup, is_rollup_suspended
+
+
+# Precincts changed by this thread's current transaction, rebuilt once it commits
+_pending = threading.local()
+
+
+def pending_precincts():
+    if not hasattr(_pending, 'precincts'):
+        _pending.precincts = set()
+    return _pending.precincts
+
+
+def flush_precincts():
+    '''Rebuild the rollup for the pending precincts and bump the data version, once.
+
+    Every edit in a transaction queues this; the first call after the commit
+    does the work for all of them and the rest find nothing to do. Precincts
+    left over from a rolled-back transaction are just rebuilt needlessly.
+    '''
+    precincts = pending_precincts()
+    if not precincts:
+        return
+    changed = set(precincts)
+    precincts.clear()
+    rebuild_rollup(changed)
+    VoterDataVersion.bump()
+
+
+def mark_changed(*precincts):
+    '''Queue precincts for flush_precincts when the current transaction commits.'''
+    pending_precincts().update(precinct for precinct in precincts if precinct is not None)
+    transaction.on_commit(flush_precincts)
+
+
+@receiver(pre_save, sender=Voter)
+def remember_precinct(sender, instance, **kwargs):
+    '''Note the precinct a voter is saved from, since its rollup changes too.'''
+    if instance.pk and not is_rollup_suspended():
+        instance._old_precinct = (Voter.objects.filter(pk=instance.pk)
+                                               .values_list('precinct_number', flat=True)
+                                               .first())
+
+
+@receiver(post_save, sender=Voter)
+def voter_saved(sender, instance, **kwargs):
+    '''Queue the rollup rebuild for a voter saved outside an import.'''
+    if not is_rollup_suspended():
+        mark_changed(instance.precinct_number, getattr(instance, '_old_precinct', None))
+
+
+@receiver(post_delete, sender=Voter)
+def voter_deleted(sender, instance, **kwargs):
+    '''Queue the rollup rebuild for a voter deleted outside an import.'''
+    if not is_rollup_suspended():
+        mark_changed(instance.precinct_number)
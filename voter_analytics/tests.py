@@ -1,3 +1,245 @@
+import csv
+import os
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.http import QueryDict
 from django.test import TestCase
+from django.urls import reverse
+
+from cs412.pagination import encode_cursor
+
+from .filters import VoterFilter
+from .importer import VoterImporter
+from .views import VotersListView
+from .models import PrecinctRollup, Voter, VoterDataVersion, VoterImport
 
 # Create your tests here.
+
+def make_voter(voter_id, **fields):
+    '''Create and return a Voter with plausible defaults for any fields not given.'''
+    values = {
+        'voter_id': voter_id,
+        'first_name': 'Pat',
+        'last_name': f'Voter {voter_id}',
+        'street_number': 1,
+        'street_name': 'Main St',
+        'zip_code': '02458',
+        'date_of_birth': date(1970, 1, 1),
+        'date_of_registration': date(2000, 1, 1),
+        'party_affiliation': 'D ',
+        'precinct_number': '1',
+        'v20state': True,
+        'v21town': False,
+        'v21primary': False,
+        'v22general': True,
+        'v23town': False,
+        'voter_score': 2,
+    }
+    values.update(fields)
+    return Voter.objects.create(**values)
+
+@skipUnless(connection.vendor == 'sqlite', 'query plans are checked on SQLite')
+class VoterFilterQueryPlanTests(TestCase):
+    '''Each filter form combination should be answered from an index.
+
+    The election checkboxes on their own are not indexed (most voters share
+    the same few values), so they are only checked together with the
+    selective filters.
+    '''
+
+    FILTERS = [
+        'party_affiliation=D+',
+        'party_affiliation=D+&voter_score=3',
+        'party_affiliation=R+&min_birth_year=1950',
+        'party_affiliation=U+&voter_score=2&min_birth_year=1960&max_birth_year=1980',
+        'party_affiliation=D+&v20state=True&v22general=True',
+        'voter_score=5',
+        'voter_score=1&max_birth_year=1970',
+        'voter_score=4&v21town=True',
+        'min_birth_year=1990',
+        'min_birth_year=1940&max_birth_year=1950',
+        'max_birth_year=1930&v23town=True',
+    ]
+
+    def get_plan(self, querystring):
+        '''Return the SQLite query plan for the voters matching querystring.'''
+        voter_filter = VoterFilter(QueryDict(querystring))
+        return voter_filter.queryset.explain()
+
+    def test_filters_use_an_index(self):
+        for querystring in self.FILTERS:
+            with self.subTest(querystring):
+                plan = self.get_plan(querystring)
+                self.assertRegex(plan, r'SEARCH voter_analytics_voter USING (COVERING )?INDEX')
+
+    def test_precinct_uses_an_index(self):
+        plan = VoterFilter(QueryDict()).queryset.filter(precinct_number='1').explain()
+        self.assertIn('voter_precinct_idx', plan)
+
+
+class ExportTests(TestCase):
+    '''The filtered voter list can be downloaded as CSV.'''
+
+    def setUp(self):
+        make_voter('A1', party_affiliation='D ')
+        make_voter('A2', party_affiliation='R ')
+
+    def test_csv_export_is_filtered(self):
+        response = self.client.get(reverse('export_voters'), {'party_affiliation': 'R '})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith('A2,'))
+
+    def test_unknown_format_is_not_echoed(self):
+        response = self.client.get(reverse('export_voters'), {'format': '<script>x</script>'})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertNotIn(b'<script>', response.content)
+
+
+class RollupTests(TestCase):
+    '''Voters written outside an import still show up in the graph data.'''
+
+    def test_direct_edits_update_the_rollup(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            voters = [make_voter(f'B{i}', date_of_birth=date(1980 + i % 2, 5, 1)) for i in range(5)]
+        self.assertEqual(VoterDataVersion.current().version, 1)
+
+        data = self.client.get(reverse('api_graph_data')).json()
+        self.assertEqual(data['birth_years'], {'years': [1980, 1981], 'counts': [3, 2]})
+        self.assertEqual(data['parties'], {'labels': ['D '], 'counts': [5]})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            voters[0].precinct_number = '2'
+            voters[0].party_affiliation = 'R '
+            voters[0].save()
+            voters[1].delete()
+        data = self.client.get(reverse('api_graph_data')).json()
+        self.assertEqual(data['parties'], {'labels': ['D ', 'R '], 'counts': [3, 1]})
+
+    def test_bulk_delete_rebuilds_once(self):
+        for i in range(10):
+            make_voter(f'D{i}', precinct_number=str(i % 3))
+        version = VoterDataVersion.current().version
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(2):  # the select and delete; the rebuild waits for the commit
+                Voter.objects.all().delete()
+        self.assertEqual(VoterDataVersion.current().version, version + 1)
+        self.assertFalse(VoterImport.objects.exists())
+        self.assertFalse(PrecinctRollup.objects.exists())
+
+
+class ImporterTests(TestCase):
+    '''Reloading the voter file reconciles the Voter table by Voter ID Number.'''
+
+    HEADER = ['Voter ID Number', 'Last Name', 'First Name', 'Street Number', 'Street Name',
+              'Apartment Number', 'Zip Code', 'Date of Birth', 'Date of Registration',
+              'Party Affiliation', 'Precinct Number', 'v20state', 'v21town', 'v21primary',
+              'v22general', 'v23town', 'voter_score']
+
+    def row(self, voter_id, last_name='Smith', date_of_birth='1970-01-01'):
+        return [voter_id, last_name, 'Pat', '1', 'Main St', '', '02458', date_of_birth, '2000-01-01',
+                'D', '1', 'TRUE', 'FALSE', 'FALSE', 'TRUE', 'FALSE', '2']
+
+    def load(self, rows, **kwargs):
+        '''Write rows to a CSV file and import it; return the importer.'''
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'voters.csv')
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.HEADER)
+            writer.writerows(rows)
+        return VoterImporter(path, chunk_size=2, **kwargs).run()
+
+    def test_reload_inserts_updates_and_deletes(self):
+        self.load([self.row('1'), self.row('2'), self.row('3')])
+        importer = self.load([self.row('1'), self.row('2', last_name='Jones'), self.row('4')])
+        self.assertEqual((importer.inserted, importer.updated, importer.unchanged, importer.deleted),
+                         (1, 1, 1, 1))
+        self.assertEqual(sorted(Voter.objects.values_list('voter_id', flat=True)), ['1', '2', '4'])
+        self.assertEqual(Voter.objects.get(voter_id='2').last_name, 'Jones')
+        self.assertEqual(Voter.objects.get(voter_id='1').party_affiliation, 'D ')
+
+    def test_rejected_row_does_not_delete_its_voter(self):
+        self.load([self.row('1'), self.row('2')])
+        importer = self.load([self.row('1'), self.row('2', date_of_birth='not a date')])
+        self.assertEqual((importer.rejected, importer.deleted), (1, 0))
+        self.assertTrue(Voter.objects.filter(voter_id='2').exists())
+
+    def test_duplicates_are_rejected_across_chunks(self):
+        # chunk_size is 2, so the repeat of voter 1 is in a later chunk
+        importer = self.load([self.row('1'), self.row('2'), self.row('3'), self.row('1', last_name='Jones')])
+        self.assertEqual((importer.inserted, importer.rejected), (3, 1))
+        self.assertEqual(Voter.objects.get(voter_id='1').last_name, 'Smith')
+
+    def test_rejected_row_then_valid_row_for_the_same_voter(self):
+        self.load([self.row('1'), self.row('2')])
+        importer = self.load([self.row('2', date_of_birth='typo'), self.row('1'), self.row('2', last_name='Jones')])
+        self.assertEqual((importer.rejected, importer.updated, importer.deleted), (1, 1, 0))
+        self.assertEqual(Voter.objects.get(voter_id='2').last_name, 'Jones')
+
+    def test_rejected_row_without_id_deletes_nothing(self):
+        self.load([self.row('1'), self.row('2')])
+        importer = self.load([self.row('1'), self.row('')])
+        self.assertEqual((importer.rejected, importer.deleted), (1, 0))
+        self.assertEqual(Voter.objects.count(), 2)
+
+    def test_failed_replace_keeps_the_old_voters(self):
+        self.load([self.row('1'), self.row('2')])
+        with self.assertRaises(FileNotFoundError):
+            VoterImporter(os.path.join(tempfile.gettempdir(), 'missing-voters.csv'), replace=True).run()
+        with self.assertRaises(ValueError):
+            self.load([self.row('3', date_of_birth='not a date')], replace=True)
+        self.assertEqual(sorted(Voter.objects.values_list('voter_id', flat=True)), ['1', '2'])
+
+    def test_replace_reloads_everything(self):
+        self.load([self.row('1'), self.row('2'), self.row('3')])
+        importer = self.load([self.row('5')], replace=True)
+        self.assertEqual((importer.deleted, importer.inserted), (3, 1))
+        self.assertEqual(list(Voter.objects.values_list('voter_id', flat=True)), ['5'])
+
+
+class PlotlyJSTests(TestCase):
+    '''plotly.js is served with long-lived cache headers and revalidates with a 304.'''
+
+    def test_plotly_js_is_cacheable(self):
+        response = self.client.get(reverse('plotly_js'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        gzipped = self.client.get(reverse('plotly_js'), HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertLess(len(gzipped.content), len(response.content))
+        response = self.client.get(reverse('plotly_js'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+
+class VoterListTests(TestCase):
+    '''The voter list is paged by cursor, forwards and backwards.'''
+
+    def setUp(self):
+        for i in range(5):
+            make_voter(f'C{i}', last_name=f'Name {i}')
+
+    def get_page(self, cursor=None):
+        params = {'cursor': cursor} if cursor else {}
+        return self.client.get(reverse('voters'), params).context['page_obj']
+
+    def test_pages_forward_and_back(self):
+        with mock.patch.object(VotersListView, 'paginate_by', 2):
+            first = self.get_page()
+            second = self.get_page(first.next_cursor)
+            self.assertEqual([v.voter_id for v in second], ['C2', 'C3'])
+            self.assertEqual([v.voter_id for v in self.get_page(second.previous_cursor)], ['C0', 'C1'])
+
+    def test_bad_cursor_starts_at_the_top(self):
+        for values in (['a', 'b', 'x'], [{}, [], None]):
+            with self.subTest(values):
+                page = self.get_page(encode_cursor('next', values))
+                self.assertEqual(page.object_list[0].voter_id, 'C0')
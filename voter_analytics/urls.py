@@ -5,11 +5,16 @@
 # description: URL patterns for voter_analytics application.
 
 from django.urls import path
-from .views import VotersListView, VoterDetailView, GraphsView
+from .views import VotersListView, VoterDetailView, GraphsView, plotly_js, graph_data_api, export_voters
 
 urlpatterns = [
     path('', VotersListView.as_view(), name='home'),
     path('voters', VotersListView.as_view(), name='voters'),
     path('voter/<int:pk>', VoterDetailView.as_view(), name='voter'),
     path('graphs', GraphsView.as_view(), name='graphs'),
+    path('plotly.js', plotly_js, name='plotly_js'),
+    path('voters/export', export_voters, name='export_voters'),
+    
+    # API endpoints
+    path('api/graphs', graph_data_api, name='api_graph_data'),
 ]
\ No newline at end of file
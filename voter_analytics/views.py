@@ -4,66 +4,89 @@
 # date: October 31, 2025
 # description: Views for voter_analytics application including VotersListView, VoterDetailView, and GraphsView with filtering and graphing functionality.
 
+import hashlib
+import re
+from functools import lru_cache
+
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
 from django.views.generic import ListView, DetailView
-from .models import Voter
+from .models import Voter, VoterDataVersion
+from .filters import VoterFilter
+from cs412.pagination import KeysetPaginator
+from .aggregates import graph_data
+from .rollup import can_use_rollup, rollup_graph_data
+from .export import export_rows, csv_chunks, parquet_available, parquet_chunks
 import plotly
 import plotly.graph_objs as go
+from plotly.offline import get_plotlyjs
+
+# Accept-Encoding values that allow the gzipped plotly.js bundle
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+def get_graph_data(voter_filter):
+    '''Return the graph aggregates for voter_filter.
+
+    Read from the PrecinctRollup table when it can answer the filter set,
+    otherwise aggregate the Voter table directly.
+    '''
+    if can_use_rollup(voter_filter):
+        return rollup_graph_data(voter_filter)
+    return graph_data(voter_filter.queryset)
+
+
+class VoterFilterMixin:
+    '''Apply the filter form's VoterFilter to a view's Voter queryset.'''
+    
+    def get_voter_filter(self):
+        '''Return the VoterFilter for this request (built once per request).'''
+        if not hasattr(self, 'voter_filter'):
+            self.voter_filter = VoterFilter(self.request.GET)
+        return self.voter_filter
+    
+    def get_queryset(self):
+        '''Return the queryset of voters, potentially filtered.'''
+        return self.get_voter_filter().queryset
+    
+    def get_context_data(self, **kwargs):
+        '''Add the filter to the context so templates can keep it in links.'''
+        context = super().get_context_data(**kwargs)
+        context['voter_filter'] = self.get_voter_filter()
+        return context
+
 
-class VotersListView(ListView):
+class VotersListView(VoterFilterMixin, ListView):
     '''View to display all voter records.'''
     
     template_name = 'voter_analytics/voters.html'
     model = Voter
     context_object_name = 'voters'
     paginate_by = 100
+    ordering = ['last_name', 'first_name', 'pk']
     
-    def get_queryset(self):
-        '''Return the queryset of voters, potentially filtered.'''
-        
-        # Start with all voters
-        qs = super().get_queryset()
-        
-        # Filter by party affiliation
-        if 'party_affiliation' in self.request.GET:
-            party = self.request.GET['party_affiliation']
-            if party:  # Only filter if a party was selected
-                qs = qs.filter(party_affiliation=party)
-        
-        # Filter by minimum birth year
-        if 'min_birth_year' in self.request.GET:
-            min_year = self.request.GET['min_birth_year']
-            if min_year:
-                qs = qs.filter(date_of_birth__year__gte=min_year)
-        
-        # Filter by maximum birth year
-        if 'max_birth_year' in self.request.GET:
-            max_year = self.request.GET['max_birth_year']
-            if max_year:
-                qs = qs.filter(date_of_birth__year__lte=max_year)
-        
-        # Filter by voter score
-        if 'voter_score' in self.request.GET:
-            score = self.request.GET['voter_score']
-            if score:
-                qs = qs.filter(voter_score=score)
-        
-        # Filter by elections voted in
-        if 'v20state' in self.request.GET:
-            qs = qs.filter(v20state=True)
-        
-        if 'v21town' in self.request.GET:
-            qs = qs.filter(v21town=True)
-        
-        if 'v21primary' in self.request.GET:
-            qs = qs.filter(v21primary=True)
-        
-        if 'v22general' in self.request.GET:
-            qs = qs.filter(v22general=True)
-        
-        if 'v23town' in self.request.GET:
-            qs = qs.filter(v23town=True)
-        
-        return qs
+    def paginate_queryset(self, queryset, page_size):
+        '''Return one page of voters using keyset pagination on ?cursor=.'''
+        paginator = KeysetPaginator(
+            queryset,
+            page_size,
+            ordering=self.get_ordering(),
+            count_key=self.get_voter_filter().cache_key('count'),
+        )
+        page = paginator.page(self.request.GET.get('cursor'))
+        return (paginator, page, page.object_list, page.has_other_pages())
+    
+    def get_context_data(self, **kwargs):
+        '''Only offer the Parquet export when pyarrow is installed.'''
+        context = super().get_context_data(**kwargs)
+        context['parquet_available'] = parquet_available()
+        return context
     
     
 class VoterDetailView(DetailView):
@@ -73,144 +96,141 @@ class VoterDetailView(DetailView):
     model = Voter
     context_object_name = 'voter'
     
-class GraphsView(ListView):
+class GraphsView(VoterFilterMixin, ListView):
     '''View to display graphs of voter data.'''
     
     template_name = 'voter_analytics/graphs.html'
     model = Voter
     context_object_name = 'voters'
     
-    def get_queryset(self):
-        '''Return the queryset of voters, potentially filtered.'''
-        
-        # Start with all voters
-        qs = super().get_queryset()
-        
-        # Apply the same filters as VotersListView
-        # Filter by party affiliation
-        if 'party_affiliation' in self.request.GET:
-            party = self.request.GET['party_affiliation']
-            if party:
-                qs = qs.filter(party_affiliation=party)
-        
-        # Filter by minimum birth year
-        if 'min_birth_year' in self.request.GET:
-            min_year = self.request.GET['min_birth_year']
-            if min_year:
-                qs = qs.filter(date_of_birth__year__gte=min_year)
-        
-        # Filter by maximum birth year
-        if 'max_birth_year' in self.request.GET:
-            max_year = self.request.GET['max_birth_year']
-            if max_year:
-                qs = qs.filter(date_of_birth__year__lte=max_year)
-        
-        # Filter by voter score
-        if 'voter_score' in self.request.GET:
-            score = self.request.GET['voter_score']
-            if score:
-                qs = qs.filter(voter_score=score)
-        
-        # Filter by elections voted in
-        if 'v20state' in self.request.GET:
-            qs = qs.filter(v20state=True)
-        
-        if 'v21town' in self.request.GET:
-            qs = qs.filter(v21town=True)
-        
-        if 'v21primary' in self.request.GET:
-            qs = qs.filter(v21primary=True)
-        
-        if 'v22general' in self.request.GET:
-            qs = qs.filter(v22general=True)
-        
-        if 'v23town' in self.request.GET:
-            qs = qs.filter(v23town=True)
-        
-        return qs
+    # rendered charts are cached per filter set and voter data version
+    chart_cache_timeout = 60 * 60
     
     def get_context_data(self, **kwargs):
         '''Add graph data to context.'''
         
         context = super().get_context_data(**kwargs)
         
-        # Get the filtered queryset
-        voters = self.get_queryset()
+        # Render the graphs, or reuse the ones rendered for the same filters
+        cache_key = self.get_voter_filter().cache_key('graphs')
+        graphs = cache.get_or_set(cache_key, self.render_graphs, self.chart_cache_timeout)
+        context.update(graphs)
         
-        # Graph 1: Distribution by Year of Birth (Histogram)
-        birth_years = [voter.date_of_birth.year for voter in voters]
-        
-        # Count voters by year
-        from collections import Counter
-        year_counts = Counter(birth_years)
-        
-        x_years = sorted(year_counts.keys())
-        y_counts = [year_counts[year] for year in x_years]
-        
-        fig_birth_year = go.Bar(x=x_years, y=y_counts)
-        graph_birth_year = plotly.offline.plot(
-            {"data": [fig_birth_year],
-             "layout": {"title": "Distribution of Voters by Year of Birth"}},
+        # the plotly.js library is loaded once from plotly_js, not inlined in each graph
+        context['plotly_version'] = plotly.__version__
+        return context
+    
+    def render_graph(self, data, title):
+        '''Return the HTML div for one plotly figure, without the plotly.js library.'''
+        return plotly.offline.plot(
+            {"data": [data],
+             "layout": {"title": title}},
             auto_open=False,
-            output_type="div"
+            output_type="div",
+            include_plotlyjs=False,
         )
-        context['graph_birth_year'] = graph_birth_year
+    
+    def render_graphs(self):
+        '''Return a dict with the HTML divs of the three graphs.'''
         
-        # Graph 2: Distribution by Party Affiliation (Pie Chart)
-        party_counts = {}
-        for voter in voters:
-            party = voter.party_affiliation
-            party_counts[party] = party_counts.get(party, 0) + 1
+        # Get the aggregates for the filtered voters (computed in the
+        # database, so no Voter instances are loaded)
+        data = get_graph_data(self.get_voter_filter())
+        graphs = {}
         
-        x_parties = list(party_counts.keys())
-        y_party_counts = list(party_counts.values())
+        # Graph 1: Distribution by Year of Birth (Histogram)
+        fig_birth_year = go.Bar(x=data['birth_years']['years'], y=data['birth_years']['counts'])
+        graphs['graph_birth_year'] = self.render_graph(fig_birth_year, "Distribution of Voters by Year of Birth")
         
-        fig_party = go.Pie(labels=x_parties, values=y_party_counts)
-        graph_party = plotly.offline.plot(
-            {"data": [fig_party],
-             "layout": {"title": "Distribution of Voters by Party Affiliation"}},
-            auto_open=False,
-            output_type="div"
-        )
-        context['graph_party'] = graph_party
+        # Graph 2: Distribution by Party Affiliation (Pie Chart)
+        fig_party = go.Pie(labels=data['parties']['labels'], values=data['parties']['counts'])
+        graphs['graph_party'] = self.render_graph(fig_party, "Distribution of Voters by Party Affiliation")
         
         # Graph 3: Distribution by Election Participation (Histogram)
-        elections = {
-            'v20state': 0,
-            'v21town': 0,
-            'v21primary': 0,
-            'v22general': 0,
-            'v23town': 0
-        }
-        
-        for voter in voters:
-            if voter.v20state:
-                elections['v20state'] += 1
-            if voter.v21town:
-                elections['v21town'] += 1
-            if voter.v21primary:
-                elections['v21primary'] += 1
-            if voter.v22general:
-                elections['v22general'] += 1
-            if voter.v23town:
-                elections['v23town'] += 1
-        
-        x_elections = ['2020 State', '2021 Town', '2021 Primary', '2022 General', '2023 Town']
-        y_election_counts = [
-            elections['v20state'],
-            elections['v21town'],
-            elections['v21primary'],
-            elections['v22general'],
-            elections['v23town']
-        ]
-        
-        fig_elections = go.Bar(x=x_elections, y=y_election_counts)
-        graph_elections = plotly.offline.plot(
-            {"data": [fig_elections],
-             "layout": {"title": "Voter Participation in Each Election"}},
-            auto_open=False,
-            output_type="div"
-        )
-        context['graph_elections'] = graph_elections
+        fig_elections = go.Bar(x=data['elections']['labels'], y=data['elections']['counts'])
+        graphs['graph_elections'] = self.render_graph(fig_elections, "Voter Participation in Each Election")
         
-        return context
\ No newline at end of file
+        return graphs
+
+
+@lru_cache(maxsize=2)
+def plotly_js_bundle(gzipped=False):
+    '''Return the plotly.js library as bytes (optionally gzipped), built once per process.'''
+    content = get_plotlyjs().encode()
+    return compress_string(content) if gzipped else content
+
+
+def plotly_js_etag(request):
+    '''Return the ETag for plotly_js: the bundle only changes with the plotly version.'''
+    return f'plotly-{plotly.__version__}'
+
+
+@cache_control(public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+@condition(etag_func=plotly_js_etag)
+def plotly_js(request):
+    '''Serve the plotly.js library used by the graphs page.
+
+    The URL includes the plotly version, so browsers can cache it for a year;
+    a revalidation (or a client that ignores the version) gets a 304.
+    '''
+    gzipped = bool(ACCEPTS_GZIP.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+    response = HttpResponse(plotly_js_bundle(gzipped), content_type='application/javascript')
+    if gzipped:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+
+def export_voters(request):
+    '''Stream the voters matching the filters in the query string as a file.
+
+    ?format=csv (the default) or ?format=parquet (requires pyarrow).
+    '''
+    voter_filter = VoterFilter(request.GET)
+    export_format = request.GET.get('format', 'csv')
+    rows = export_rows(voter_filter.queryset)
+    
+    if export_format == 'csv':
+        content = csv_chunks(rows)
+        content_type = 'text/csv'
+    elif export_format == 'parquet':
+        if not parquet_available():
+            return HttpResponseBadRequest('Parquet export requires the pyarrow package.',
+                                          content_type='text/plain')
+        content = parquet_chunks(rows)
+        content_type = 'application/vnd.apache.parquet'
+    else:
+        # the format is not echoed back, so the response cannot carry markup
+        return HttpResponseBadRequest('Unknown export format; use csv or parquet.',
+                                      content_type='text/plain')
+    
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="voters.{export_format}"'
+    return response
+
+
+def graph_data_etag(request):
+    '''Return the ETag for graph_data_api: the filter set plus the data version.'''
+    key = VoterFilter(request.GET).cache_key('graph_data')
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def graph_data_last_modified(request):
+    '''Return when the voter data last changed, for graph_data_api.'''
+    return VoterDataVersion.current().changed_at
+
+
+@condition(etag_func=graph_data_etag, last_modified_func=graph_data_last_modified)
+@api_view(['GET'])
+def graph_data_api(request):
+    '''
+    API view to return the data behind the graphs for the filters in the query string.
+    '''
+    voter_filter = VoterFilter(request.GET)
+    data = cache.get_or_set(
+        voter_filter.cache_key('graph_data'),
+        lambda: get_graph_data(voter_filter),
+        GraphsView.chart_cache_timeout,
+    )
+    return Response(data)